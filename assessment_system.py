@@ -124,6 +124,27 @@ class AssessmentSystem:
                 } for q in assessment_tool.questions
             ]
         }
+
+    def expand_responses(self, assessment_type: str, responses: Dict) -> Dict[str, Any]:
+        """Rebuild full question/answer text from compact {'r': index, 'score': n} responses"""
+        assessment_tool = self.assessments.get(assessment_type)
+        if not assessment_tool:
+            return responses
+        
+        expanded = {}
+        for key, entry in responses.items():
+            if not isinstance(entry, dict) or 'r' not in entry:
+                expanded[key] = entry  # already in the long form
+                continue
+            question = assessment_tool.questions[int(key.rsplit('_', 1)[-1]) - 1]
+            expanded[key] = {
+                'question': question.text,
+                'response_index': entry['r'],
+                'response_text': question.options[entry['r']],
+                'score': entry['score']
+            }
+        return expanded
+    
     def calculate_severity(self, assessment_type: str, total_score: int) -> str:
         """Calculate severity level from total score"""
         if assessment_type not in self.assessments:
@@ -153,7 +174,7 @@ class AssessmentSystem:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             patient_id, session_id, assessment_type, 
-            json.dumps(responses), total_score, severity_level,
+            json.dumps(responses, separators=(',', ':')), total_score, severity_level,
             datetime.now().isoformat(), interpretation
         ))
         
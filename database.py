@@ -9,7 +9,7 @@ import json
 import os
 import shutil
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Union, Iterator, Tuple
 from contextlib import contextmanager
 import threading
 from pathlib import Path
@@ -33,6 +33,28 @@ except ImportError:
 class TherapyDatabase:
     """Main database class for the therapy system"""
     
+    # Shared by insert_patient and insert_patients_many; executemany prepares
+    # it once for the whole batch. Column order matches Patient._INSERT_COLS
+    INSERT_PATIENT_SQL = '''
+        INSERT INTO patients 
+        (name, date_of_birth, gender, contact_info, emergency_contact, 
+         created_date, last_updated, risk_level, preferred_therapy_mode, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    # Sections of a full patient export, in output order
+    PATIENT_EXPORT_QUERIES = (
+        ('patient_info', "SELECT * FROM patients WHERE id = ?"),
+        ('sessions', "SELECT * FROM sessions WHERE patient_id = ? ORDER BY session_date"),
+        ('assessments', "SELECT * FROM assessments WHERE patient_id = ? ORDER BY assessment_date"),
+        ('diagnoses', "SELECT * FROM diagnoses WHERE patient_id = ? ORDER BY date_diagnosed"),
+        ('treatment_goals', "SELECT * FROM treatment_goals WHERE patient_id = ? ORDER BY created_date"),
+        ('homework_assignments', "SELECT * FROM homework_assignments WHERE patient_id = ? ORDER BY assigned_date"),
+        ('progress_notes', "SELECT * FROM progress_notes WHERE patient_id = ? ORDER BY created_date"),
+        ('treatment_plans', "SELECT * FROM treatment_plans WHERE patient_id = ? ORDER BY created_date"),
+        ('crisis_plans', "SELECT * FROM crisis_plans WHERE patient_id = ? ORDER BY created_date")
+    )
+    
     def __init__(self, db_path: str = None):
         self.db_path = db_path or Config.DATABASE_PATH
         self.lock = threading.Lock()
@@ -40,10 +62,10 @@ class TherapyDatabase:
     def initialize_database(self):
         """Initialize database with complete schema"""
         with self.get_connection() as conn:
-            # Enable foreign keys and optimization
+            # Enable foreign keys and WAL (persisted in the database file);
+            # the per-connection tuning pragmas are applied in get_connection()
             conn.execute("PRAGMA foreign_keys = ON")
             conn.execute("PRAGMA journal_mode = WAL")
-            conn.execute("PRAGMA synchronous = NORMAL")
             
             self._create_all_tables(conn)
             self._create_indexes(conn)
@@ -56,6 +78,7 @@ class TherapyDatabase:
         try:
             conn = sqlite3.connect(self.db_path, timeout=30.0)
             conn.row_factory = sqlite3.Row  # Enable dict-like access
+            self._apply_pragmas(conn)
             yield conn
             # Only commit if connection is still open
             if conn and not hasattr(conn, '_closed') or not getattr(conn, '_closed', False):
@@ -75,6 +98,13 @@ class TherapyDatabase:
                 except sqlite3.ProgrammingError:
                     pass  # Connection already closed
     
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection):
+        """Per-connection tuning; with WAL, synchronous=NORMAL may lose the
+        last sub-second of writes on power loss or an OS crash"""
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+    
     def _create_all_tables(self, conn: sqlite3.Connection):
         """Create all database tables"""
         
@@ -264,12 +294,16 @@ class TherapyDatabase:
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(name)",
             "CREATE INDEX IF NOT EXISTS idx_patients_active ON patients(active)",
+            "CREATE INDEX IF NOT EXISTS idx_patients_last_updated ON patients(last_updated DESC)",
             "CREATE INDEX IF NOT EXISTS idx_sessions_patient_date ON sessions(patient_id, session_date)",
+            "CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(session_date DESC)",
             "CREATE INDEX IF NOT EXISTS idx_sessions_type ON sessions(session_type)",
-            "CREATE INDEX IF NOT EXISTS idx_assessments_patient_type ON assessments(patient_id, assessment_type)",
+            "CREATE INDEX IF NOT EXISTS idx_assessments_patient_type_date ON assessments(patient_id, assessment_type, assessment_date DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_assessments_patient_date ON assessments(patient_id, assessment_date DESC)",
             "CREATE INDEX IF NOT EXISTS idx_assessments_date ON assessments(assessment_date)",
-            "CREATE INDEX IF NOT EXISTS idx_goals_patient_status ON treatment_goals(patient_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_goals_patient_status_created ON treatment_goals(patient_id, status, created_date DESC)",
             "CREATE INDEX IF NOT EXISTS idx_homework_patient_due ON homework_assignments(patient_id, due_date)",
+            "CREATE INDEX IF NOT EXISTS idx_homework_patient_completed_due ON homework_assignments(patient_id, completed, due_date)",
             "CREATE INDEX IF NOT EXISTS idx_homework_completed ON homework_assignments(completed)",
             "CREATE INDEX IF NOT EXISTS idx_notes_patient_date ON progress_notes(patient_id, created_date)",
             "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON system_logs(timestamp)",
@@ -289,6 +323,21 @@ class TherapyDatabase:
             columns = [description[0] for description in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
+    def execute_query_iter(self, query: str, params: tuple = ()) -> Iterator[Dict[str, Any]]:
+        """Execute a SELECT query and yield rows as dicts without fetching them all"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            for row in cursor:
+                yield dict(zip(columns, row))
+    
+    def execute_query_rows(self, query: str, params: tuple = ()) -> List[Tuple]:
+        """Execute a SELECT query and return results as plain tuples in column order"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute an INSERT/UPDATE/DELETE query and return last row ID or rows affected"""
         with self.get_connection() as conn:
@@ -298,6 +347,25 @@ class TherapyDatabase:
             else:
                 return cursor.rowcount
     
+    def get_patient_minimal(self, patient_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch just the patient columns commands need, or None if missing"""
+        rows = self.execute_query(
+            "SELECT id, name, preferred_therapy_mode, risk_level FROM patients WHERE id = ? LIMIT 1",
+            (patient_id,)
+        )
+        return rows[0] if rows else None
+    
+    def insert_patient(self, patient) -> int:
+        """Insert a Patient model and return its new ID"""
+        return self.execute_update(self.INSERT_PATIENT_SQL, patient.insert_tuple())
+    
+    def insert_patients_many(self, patients) -> int:
+        """Insert many Patient models in one transaction and return rows inserted"""
+        with self.get_connection() as conn:
+            cursor = conn.executemany(self.INSERT_PATIENT_SQL,
+                                      (p.insert_tuple() for p in patients))
+            return cursor.rowcount
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         stats = {
@@ -395,20 +463,7 @@ class TherapyDatabase:
             'patient_id': patient_id
         }
         
-        # Define queries for patient data
-        data_queries = [
-            ('patient_info', "SELECT * FROM patients WHERE id = ?"),
-            ('sessions', "SELECT * FROM sessions WHERE patient_id = ? ORDER BY session_date"),
-            ('assessments', "SELECT * FROM assessments WHERE patient_id = ? ORDER BY assessment_date"),
-            ('diagnoses', "SELECT * FROM diagnoses WHERE patient_id = ? ORDER BY date_diagnosed"),
-            ('treatment_goals', "SELECT * FROM treatment_goals WHERE patient_id = ? ORDER BY created_date"),
-            ('homework_assignments', "SELECT * FROM homework_assignments WHERE patient_id = ? ORDER BY assigned_date"),
-            ('progress_notes', "SELECT * FROM progress_notes WHERE patient_id = ? ORDER BY created_date"),
-            ('treatment_plans', "SELECT * FROM treatment_plans WHERE patient_id = ? ORDER BY created_date"),
-            ('crisis_plans', "SELECT * FROM crisis_plans WHERE patient_id = ? ORDER BY created_date")
-        ]
-        
-        for key, query in data_queries:
+        for key, query in self.PATIENT_EXPORT_QUERIES:
             try:
                 results = self.execute_query(query, (patient_id,))
                 patient_data[key] = results
@@ -419,6 +474,15 @@ class TherapyDatabase:
         log_action(f"Patient data exported for ID {patient_id}", "database", patient_id=patient_id)
         return patient_data
     
+    def iter_patient_records(self, patient_id: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (section, row) pairs for all of a patient's data, one row at a time"""
+        for key, query in self.PATIENT_EXPORT_QUERIES:
+            try:
+                for row in self.execute_query_iter(query, (patient_id,)):
+                    yield key, row
+            except sqlite3.Error as e:
+                log_action(f"Error exporting {key} for patient {patient_id}: {e}", "database", "ERROR")
+    
     def cleanup_old_data(self, days_to_keep: int = 90) -> Dict[str, int]:
         """Clean up old log entries and system data"""
         cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
@@ -6,29 +6,24 @@ Comprehensive therapy application using Gemini 2.5 Pro as the core AI engine
 
 import os
 import sys
+import sqlite3
+import array
+import functools
+import itertools
 import click
-import asyncio
 import json
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
-from tabulate import tabulate
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 
-# Import all system modules
+# Subsystem modules (database, session manager, therapy modules, ...) and
+# tabulate/asyncio are imported lazily by the commands that need them so
+# that `--help` and lightweight commands don't pay their import cost.
 from config import Config
-from database import TherapyDatabase
-from models import Patient, Session, Assessment
-from session_manager import SessionManager
-from assessment_system import AssessmentSystem
-from therapy_modules import TherapyModuleIntegrator
-from goal_manager import GoalManager
-from homework_system import HomeworkSystem
-from documentation import DocumentationSystem
-from crisis_manager import CrisisManager
 from utils import (
-    setup_logging, log_action, monitor_system_health, 
+    setup_logging, log_action, flush_logs, monitor_system_health, 
     format_datetime, validate_system_requirements,
-    create_system_backup, export_patient_data,
-    generate_system_report
+    create_system_backup, export_patient_data, save_report,
+    get_system_report
 )
 
 
@@ -61,18 +56,8 @@ class TherapySystemCLI:
                 self.logger.error(f"System requirements not met: {missing}")
                 return False
             
-            # Initialize database
-            self.db = TherapyDatabase()
-            self.db.initialize_database()
-            
-            # Initialize core components
-            self.session_manager = SessionManager(self.db)
-            self.assessment_system = AssessmentSystem(self.db)
-            self.therapy_modules = TherapyModuleIntegrator()
-            self.goal_manager = GoalManager(self.db)
-            self.homework_system = HomeworkSystem(self.db)
-            self.documentation = DocumentationSystem(self.db)
-            self.crisis_manager = CrisisManager(self.db)
+            # Initialize database and core components
+            self._load_components(initialize_db=True)
             
             # Verify Gemini API key
             if not Config.GEMINI_API_KEY or Config.GEMINI_API_KEY == 'your-api-key-here':
@@ -90,14 +75,51 @@ class TherapySystemCLI:
                 print(f"CRITICAL: System initialization failed: {e}")
             return False
     
+    def _load_components(self, initialize_db: bool = False):
+        """Import and construct the database and therapy subsystems"""
+        from database import TherapyDatabase
+        from session_manager import SessionManager
+        from assessment_system import AssessmentSystem
+        from therapy_modules import TherapyModuleIntegrator
+        from goal_manager import GoalManager
+        from homework_system import HomeworkSystem
+        from documentation import DocumentationSystem
+        from crisis_manager import CrisisManager
+        
+        self.db = TherapyDatabase()
+        if initialize_db:
+            self.db.initialize_database()
+        
+        self.session_manager = SessionManager(self.db)
+        self.assessment_system = AssessmentSystem(self.db)
+        self.therapy_modules = TherapyModuleIntegrator()
+        self.goal_manager = GoalManager(self.db)
+        self.homework_system = HomeworkSystem(self.db)
+        self.documentation = DocumentationSystem(self.db)
+        self.crisis_manager = CrisisManager(self.db)
+    
+    async def _end_sessions(self, patient_ids: List[int]) -> List[Any]:
+        """End several sessions at once, collecting errors instead of raising"""
+        import asyncio
+        
+        return await asyncio.gather(
+            *(self.session_manager.end_session(pid) for pid in patient_ids),
+            return_exceptions=True
+        )
+    
     def shutdown_system(self):
         """Graceful system shutdown"""
         try:
             if self.session_manager:
-                # End any active sessions
+                import asyncio
+                
+                # End any active sessions concurrently
                 active_sessions = list(self.session_manager.active_sessions.keys())
-                for patient_id in active_sessions:
-                    asyncio.run(self.session_manager.end_session(patient_id))
+                if active_sessions:
+                    results = asyncio.run(self._end_sessions(active_sessions))
+                    for patient_id, result in zip(active_sessions, results):
+                        if isinstance(result, Exception) and self.logger:
+                            self.logger.error(f"Error ending session for patient {patient_id} during shutdown: {result}")
             
             if self.db:
                 # Backup database
@@ -105,6 +127,7 @@ class TherapySystemCLI:
                 log_action(f"Shutdown backup created: {backup_file}", "main")
             
             log_action("System shutdown completed", "main")
+            flush_logs()
             
         except Exception as e:
             if self.logger:
@@ -112,8 +135,11 @@ class TherapySystemCLI:
     
     def check_initialization(self):
         """Check if system is properly initialized"""
+        # Help output doesn't need the database or any subsystem loaded
+        if _help_requested(sys.argv):
+            return
+        
         # Check if database exists and has tables
-        import os
         if not os.path.exists('therapy.db'):
             click.echo("❌ System not initialized. Please run initialization first.")
             sys.exit(1)
@@ -121,38 +147,187 @@ class TherapySystemCLI:
         # Initialize components if they don't exist
         if not self.db:
             try:
-                self.db = TherapyDatabase()
-                self.session_manager = SessionManager(self.db)
-                self.assessment_system = AssessmentSystem(self.db)
-                self.therapy_modules = TherapyModuleIntegrator()
-                self.goal_manager = GoalManager(self.db)
-                self.homework_system = HomeworkSystem(self.db)
-                self.documentation = DocumentationSystem(self.db)
-                self.crisis_manager = CrisisManager(self.db)
+                self._load_components()
                 self.initialized = True
             except Exception as e:
                 click.echo(f"❌ Error loading system components: {e}")
                 sys.exit(1)
 
 
+# Display labels offered by `patient create` mapped to stored gender values
+_GENDER_MAP = {
+    'Male': 'male',
+    'Female': 'female',
+    'Non-binary': 'non_binary',
+    'Prefer not to say': 'prefer_not_to_say'
+}
+
+_MODALITIES = ('CBT', 'DBT', 'ACT', 'Psychodynamic')
+
+# list_homework's derived_status -> pre-rendered status cell
+_HOMEWORK_STATUS_DISPLAY = {
+    'completed': "✅ Completed",
+    'overdue': "⏰ Overdue",
+    'pending': "📝 Pending"
+}
+
+# One UPDATE statement per combination of editable goal fields, built once
+# so update_goal doesn't assemble the SET clause on every call. Notes are
+# appended in SQL and RETURNING replaces a separate read of the goal.
+_GOAL_UPDATE_FIELDS = ('current_progress', 'status', 'notes')
+_GOAL_SET_EXPRESSIONS = {
+    'current_progress': "current_progress = ?",
+    'status': "status = ?",
+    'notes': "notes = TRIM(COALESCE(notes, '') || ?, char(32, 9, 10, 13))"
+}
+_GOAL_UPDATE_SQL = {
+    fields: ("UPDATE treatment_goals SET {}, last_updated = ? WHERE id = ? "
+             "RETURNING id, patient_id, goal_description").format(
+        ", ".join(_GOAL_SET_EXPRESSIONS[f] for f in fields))
+    for n in range(1, len(_GOAL_UPDATE_FIELDS) + 1)
+    for fields in itertools.combinations(_GOAL_UPDATE_FIELDS, n)
+}
+
+_BANNER = """
+╔══════════════════════════════════════════════════════════════╗
+║                    AI THERAPY SYSTEM MVP                     ║
+║             Comprehensive Therapy with Gemini 2.5 Pro       ║
+╚══════════════════════════════════════════════════════════════╝
+    """
+
+_SESSION_HELP = "\n".join([
+    "\n📋 Session Commands:",
+    "• 'quit' or 'exit' - End the session",
+    "• 'status' - Show session status",
+    "• 'mood [1-10]' - Rate current mood",
+    "• 'crisis' - Trigger crisis intervention",
+])
+
+# Assessment outcomes that trigger the high-risk warning
+_HIGH_RISK_SEVERITIES = frozenset({'severe', 'high'})
+_RISK_KEYWORDS = ('suicide', 'self-harm', 'ideation')
+_END_SESSION_COMMANDS = frozenset({'quit', 'exit', 'end'})
+
+# Local-time ISO-8601 "now" evaluated by SQLite, in the same sortable format
+# as datetime.now().isoformat() (millisecond precision)
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# Static text of `admin report`; only the figures are filled in per run
+_REPORT_TEMPLATE = (
+    "\n📊 System Usage Report\n"
+    + "=" * 50 + "\n"
+    "Generated: {generated}\n"
+    "\n👥 Patient Statistics:\n"
+    "   Total Patients: {p[total_patients]}\n"
+    "   Active Patients (30 days): {p[active_patients_30_days]}\n"
+    "   Activity Rate: {p[patient_activity_rate]}%\n"
+    "\n💬 Session Statistics:\n"
+    "   Total Sessions: {s[total_sessions]}\n"
+    "   Sessions (last week): {s[sessions_last_week]}\n"
+    "   Avg Sessions/Patient: {s[avg_sessions_per_patient]}\n"
+    "\n📋 Assessment Statistics:\n"
+    "   Total Assessments: {a[total_assessments]}\n"
+    "  Avg Assessments/Patient: {a[avg_assessments_per_patient]}\n"
+    "\n🏥 System Health:\n"
+    "   Status: {status}\n"
+    "   Warnings: {warnings}\n"
+    "   Errors: {errors}"
+)
+
+_SEP40 = "-" * 40
+_SEP60 = "=" * 60
+
+# Per-note blocks for `docs view`, filled from the note row
+_NOTE_HEADER_FMT = ("\nNote ID: {id} | Type: {note_type} | Session: {session}\n"
+                    "Created: {created} by {created_by}\n" + _SEP40 + "\n")
+_NOTE_FMT = {
+    'SOAP': _NOTE_HEADER_FMT + "S: {subjective}\nO: {objective}\nA: {assessment}\nP: {plan}\n",
+    None: _NOTE_HEADER_FMT + "Content: {subjective}\n"
+}
+
+
+def _help_requested(argv: List[str]) -> bool:
+    """Return True when the command line only asks for help output"""
+    return '--help' in argv[1:]
+
+
 # Initialize global CLI instance
 cli = TherapySystemCLI()
 
 
-@click.group()
+@functools.lru_cache(maxsize=512)
+def _patient(patient_id: int) -> Optional[Dict[str, Any]]:
+    """Cached minimal patient row for this process (None if missing)"""
+    return cli.db.get_patient_minimal(patient_id)
+
+
+def _page_footer(offset: int, shown: int, total: int, noun: str) -> str:
+    """Footer line for paginated listings"""
+    footer = f"\nShowing {noun} {offset + 1}-{offset + shown} of {total}"
+    if offset + shown < total:
+        footer += f"; re-run with --offset {offset + shown} for more"
+    return footer
+
+
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _write_records(columns: Tuple[str, ...], rows: Iterable[tuple], output_format: str) -> None:
+    """Stream rows as JSON lines or TSV for scripted consumers, bypassing tabulate"""
+    out = click.get_binary_stream('stdout')
+    
+    if output_format == 'json':
+        try:
+            from orjson import dumps
+        except ImportError:
+            def dumps(obj, default=None):
+                return json.dumps(obj, default=default).encode('utf-8')
+        
+        for row in rows:
+            out.write(dumps(dict(zip(columns, row)), default=str) + b'\n')
+    else:
+        # Escape backslash, tab and newline so free text keeps one record per line
+        escape = _TSV_ESCAPES
+        out.write(('\t'.join(columns) + '\n').encode('utf-8'))
+        for row in rows:
+            line = '\t'.join('' if value is None else str(value).translate(escape) for value in row)
+            out.write((line + '\n').encode('utf-8'))
+    
+    out.flush()
+
+
+def _verify_patient_session(patient_id: int, session_id: int) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Fetch the patient and their session in one query; either may be None"""
+    rows = cli.db.execute_query('''
+        SELECT p.id, p.name, s.id AS session_id, s.session_date
+        FROM patients p
+        LEFT JOIN sessions s ON s.patient_id = p.id AND s.id = ?
+        WHERE p.id = ?
+        LIMIT 1
+    ''', (session_id, patient_id))
+    if not rows:
+        return None, None
+    
+    row = rows[0]
+    patient = {'id': row['id'], 'name': row['name']}
+    session = None
+    if row['session_id'] is not None:
+        session = {'id': row['session_id'], 'patient_id': row['id'], 'session_date': row['session_date']}
+    return patient, session
+
+
+@click.group(invoke_without_command=True)
 @click.option('--debug', is_flag=True, help='Enable debug logging')
-def main(debug):
+@click.pass_context
+def main(ctx, debug):
     """AI Therapy System - Comprehensive therapy application with multiple modalities"""
     if debug:
         Config.LOG_LEVEL = 'DEBUG'
     
-    # Display welcome banner
-    click.echo("""
-╔══════════════════════════════════════════════════════════════╗
-║                    AI THERAPY SYSTEM MVP                     ║
-║             Comprehensive Therapy with Gemini 2.5 Pro       ║
-╚══════════════════════════════════════════════════════════════╝
-    """)
+    # Welcome banner only for the bare `main` invocation, not for subcommands
+    if ctx.invoked_subcommand is None:
+        click.echo(_BANNER)
+        click.echo(ctx.get_help())
 
 
 @main.command()
@@ -190,23 +365,19 @@ def patient():
 @patient.command('create')
 @click.option('--name', prompt='Patient name', help='Full name of the patient')
 @click.option('--dob', prompt='Date of birth (YYYY-MM-DD)', help='Date of birth')
-@click.option('--gender', prompt='Gender', type=click.Choice(['Male', 'Female', 'Non-binary', 'Prefer not to say']))
+@click.option('--gender', prompt='Gender', type=click.Choice(list(_GENDER_MAP)))
 @click.option('--email', prompt='Email (optional)', default='', help='Email address')
 @click.option('--phone', prompt='Phone (optional)', default='', help='Phone number')
 @click.option('--emergency-contact', prompt='Emergency contact (optional)', default='', help='Emergency contact info')
 @click.option('--therapy-mode', prompt='Preferred therapy modality', 
-              type=click.Choice(['CBT', 'DBT', 'ACT', 'Psychodynamic']), default='CBT')
+              type=click.Choice(_MODALITIES), default='CBT')
 def create_patient(name, dob, gender, email, phone, emergency_contact, therapy_mode):
     """Create a new patient profile"""
+    from models import Patient
+    
     try:
         # Convert gender to the format expected by the database
-        gender_mapping = {
-            'Male': 'male',
-            'Female': 'female', 
-            'Non-binary': 'non_binary',
-            'Prefer not to say': 'prefer_not_to_say'
-        }
-        db_gender = gender_mapping.get(gender, gender.lower())
+        db_gender = _GENDER_MAP.get(gender, gender.lower())
         
         # Prepare contact info
         contact_info = []
@@ -229,21 +400,8 @@ def create_patient(name, dob, gender, email, phone, emergency_contact, therapy_m
         patient.validate()
         
         # Save to database
-        patient_data = patient.to_dict()
-        patient_data.pop('id', None)  # Remove id for insert
-        
-        patient_id = cli.db.execute_update('''
-            INSERT INTO patients 
-            (name, date_of_birth, gender, contact_info, emergency_contact, 
-             created_date, last_updated, risk_level, preferred_therapy_mode, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            patient_data['name'], patient_data['date_of_birth'], patient_data['gender'],
-            patient_data['contact_info'], patient_data['emergency_contact'],
-            patient_data['created_date'], patient_data['last_updated'],
-            patient_data['risk_level'], patient_data['preferred_therapy_mode'],
-            patient_data['notes']
-        ))
+        patient_id = cli.db.insert_patient(patient)
+        _patient.cache_clear()  # drop any cached miss for the new ID
         
         click.echo(f"✅ Patient created successfully! ID: {patient_id}")
         log_action(f"New patient created: {name}", "patient_management", patient_id=patient_id)
@@ -251,17 +409,20 @@ def create_patient(name, dob, gender, email, phone, emergency_contact, therapy_m
     except Exception as e:
         click.echo(f"❌ Error creating patient: {e}")
 
-def timedelta(days):
-    raise NotImplementedError
-
 
 @patient.command('list')
 @click.option('--active-only', is_flag=True, help='Show only active patients')
 @click.option('--limit', default=20, help='Maximum number of patients to show')
 def list_patients(active_only, limit):
     """List all patients"""
+    from tabulate import tabulate
+    
     try:
-        query = "SELECT * FROM patients"
+        query = """
+        SELECT id, name, gender, preferred_therapy_mode, risk_level, last_updated,
+               CAST((julianday('now', 'localtime') - julianday(date_of_birth)) / 365.25 AS INTEGER) AS age
+        FROM patients
+        """
         params = []
         
         if active_only:
@@ -279,25 +440,19 @@ def list_patients(active_only, limit):
             click.echo("No patients found.")
             return
         
-        # Prepare table data
-        table_data = []
-        for patient in patients:
-            # Calculate age
-            try:
-                birth_date = datetime.fromisoformat(patient['date_of_birth']).date()
-                age = (date.today() - birth_date).days // 365
-            except:
-                age = "Unknown"
-            
-            table_data.append([
+        # Rows are generated lazily as tabulate consumes them
+        table_data = (
+            [
                 patient['id'],
                 patient['name'],
-                age,
+                patient['age'] if patient['age'] is not None else "Unknown",
                 patient['gender'],
                 patient['preferred_therapy_mode'],
                 patient['risk_level'],
                 format_datetime(patient['last_updated'], 'date_only')
-            ])
+            ]
+            for patient in patients
+        )
         
         headers = ['ID', 'Name', 'Age', 'Gender', 'Therapy Mode', 'Risk Level', 'Last Updated']
         click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
@@ -312,8 +467,26 @@ def list_patients(active_only, limit):
 def view_patient(patient_id):
     """View detailed patient information"""
     try:
-        # Get patient info
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
+        # Patient row, session summary and recent assessments in one round trip
+        patient_data = cli.db.execute_query('''
+            WITH s AS (
+                SELECT COUNT(*) AS total, MAX(session_date) AS last_session
+                FROM sessions WHERE patient_id = ?
+            ),
+            a AS (
+                SELECT assessment_type, total_score, severity_level, assessment_date
+                FROM assessments WHERE patient_id = ?
+                ORDER BY assessment_date DESC LIMIT 3
+            )
+            SELECT p.*, s.total AS session_total, s.last_session,
+                   (SELECT json_group_array(json_object(
+                        'assessment_type', assessment_type,
+                        'total_score', total_score,
+                        'severity_level', severity_level,
+                        'assessment_date', assessment_date)) FROM a) AS assessments_json
+            FROM patients p, s
+            WHERE p.id = ?
+        ''', (patient_id, patient_id, patient_id))
         if not patient_data:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
@@ -336,24 +509,16 @@ def view_patient(patient_id):
         if patient['notes']:
             click.echo(f"Notes: {patient['notes']}")
         
-        # Get session summary
-        sessions = cli.db.execute_query(
-            "SELECT COUNT(*) as total, MAX(session_date) as last_session FROM sessions WHERE patient_id = ?",
-            (patient_id,)
-        )
-        
-        if sessions and sessions[0]['total'] > 0:
+        # Session summary
+        if patient['session_total']:
             click.echo(f"\n📊 Session Summary:")
-            click.echo(f"Total Sessions: {sessions[0]['total']}")
-            click.echo(f"Last Session: {format_datetime(sessions[0]['last_session'], 'friendly')}")
+            click.echo(f"Total Sessions: {patient['session_total']}")
+            click.echo(f"Last Session: {format_datetime(patient['last_session'], 'friendly')}")
         else:
             click.echo(f"\n📊 No sessions recorded yet")
         
-        # Get recent assessments
-        assessments = cli.db.execute_query(
-            "SELECT * FROM assessments WHERE patient_id = ? ORDER BY assessment_date DESC LIMIT 3",
-            (patient_id,)
-        )
+        # Recent assessments
+        assessments = json.loads(patient['assessments_json'] or '[]')
         
         if assessments:
             click.echo(f"\n📋 Recent Assessments:")
@@ -372,19 +537,23 @@ def session():
 
 @session.command('start')
 @click.argument('patient_id', type=int)
-@click.option('--modality', type=click.Choice(['CBT', 'DBT', 'ACT', 'Psychodynamic']), 
+@click.option('--modality', type=click.Choice(_MODALITIES), 
               help='Therapy modality for this session')
 def start_session(patient_id, modality):
     """Start a new therapy session"""
+    import asyncio
+    
+    # One event loop for the whole conversation rather than one per turn
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    
     try:
         # Verify patient exists
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        if not patient_data:
+        patient = _patient(patient_id)
+        if not patient:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
         
-        patient = patient_data[0]
-        
         # Use patient's preferred modality if not specified
         if not modality:
             modality = patient['preferred_therapy_mode']
@@ -392,7 +561,7 @@ def start_session(patient_id, modality):
         click.echo(f"🔄 Starting {modality} session for {patient['name']}...")
         
         # Start session
-        result = asyncio.run(cli.session_manager.start_session(patient_id, modality))
+        result = loop.run_until_complete(cli.session_manager.start_session(patient_id, modality))
         
         click.echo(f"✅ Session started successfully!")
         click.echo(f"Session ID: {result['session_id']}")
@@ -405,22 +574,19 @@ def start_session(patient_id, modality):
         
         while True:
             user_input = click.prompt(f"\n{patient['name']}", default="", show_default=False)
+            command = user_input.lower()
             
-            if user_input.lower() in ['quit', 'exit', 'end']:
+            if command in _END_SESSION_COMMANDS:
                 # End session
-                end_result = asyncio.run(cli.session_manager.end_session(patient_id))
+                end_result = loop.run_until_complete(cli.session_manager.end_session(patient_id))
                 click.echo(f"\n✅ Session ended. Duration: {end_result['session_duration']}")
                 break
             
-            elif user_input.lower() == 'help':
-                click.echo(f"\n📋 Session Commands:")
-                click.echo(f"• 'quit' or 'exit' - End the session")
-                click.echo(f"• 'status' - Show session status")
-                click.echo(f"• 'mood [1-10]' - Rate current mood")
-                click.echo(f"• 'crisis' - Trigger crisis intervention")
+            elif command == 'help':
+                click.echo(_SESSION_HELP)
                 continue
             
-            elif user_input.lower() == 'status':
+            elif command == 'status':
                 status = cli.session_manager.get_session_status(patient_id)
                 click.echo(f"\n📊 Session Status:")
                 click.echo(f"Current Phase: {status['current_phase']}")
@@ -428,7 +594,7 @@ def start_session(patient_id, modality):
                 click.echo(f"Engagement Level: {status['engagement_level']}/10")
                 continue
             
-            elif user_input.lower().startswith('mood '):
+            elif command.startswith('mood '):
                 try:
                     mood_rating = int(user_input.split()[1])
                     if 1 <= mood_rating <= 10:
@@ -441,7 +607,7 @@ def start_session(patient_id, modality):
                     click.echo("❌ Invalid mood rating format. Use: mood [1-10]")
                 continue
             
-            elif user_input.lower() == 'crisis':
+            elif command == 'crisis':
                 click.echo("🚨 Activating crisis intervention protocols...")
                 # This would trigger crisis intervention
                 continue
@@ -451,7 +617,7 @@ def start_session(patient_id, modality):
             
             # Process user input through session manager
             try:
-                response = asyncio.run(cli.session_manager.process_user_input(patient_id, user_input))
+                response = loop.run_until_complete(cli.session_manager.process_user_input(patient_id, user_input))
                 
                 click.echo(f"\n💬 AI Therapist: {response['response']}")
                 
@@ -468,6 +634,9 @@ def start_session(patient_id, modality):
         
     except Exception as e:
         click.echo(f"❌ Error starting session: {e}")
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
 
 
 @session.command('list')
@@ -475,6 +644,8 @@ def start_session(patient_id, modality):
 @click.option('--limit', default=10, help='Maximum number of sessions to show')
 def list_sessions(patient_id, limit):
     """List recent sessions"""
+    from tabulate import tabulate
+    
     try:
         query = """
         SELECT s.*, p.name as patient_name 
@@ -496,10 +667,9 @@ def list_sessions(patient_id, limit):
             click.echo("No sessions found.")
             return
         
-        # Prepare table data
-        table_data = []
-        for session in sessions:
-            table_data.append([
+        # Rows are generated lazily as tabulate consumes them
+        table_data = (
+            [
                 session['id'],
                 session['patient_name'],
                 session['session_type'],
@@ -508,7 +678,9 @@ def list_sessions(patient_id, limit):
                 "✅" if session.get('completed') else "🔄",
                 session.get('mood_before', 'N/A'),
                 session.get('mood_after', 'N/A')
-            ])
+            ]
+            for session in sessions
+        )
         
         headers = ['ID', 'Patient', 'Type', 'Date', 'Duration', 'Status', 'Mood Before', 'Mood After']
         click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
@@ -533,12 +705,10 @@ def run_assessment(patient_id, assessment_type):
     """Run an assessment for a patient"""
     try:
         # Verify patient exists
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        if not patient_data:
+        patient = _patient(patient_id)
+        if not patient:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
-        
-        patient = patient_data[0]
         click.echo(f"📋 Running {assessment_type} assessment for {patient['name']}")
         
         # Get assessment questions
@@ -554,6 +724,7 @@ def run_assessment(patient_id, assessment_type):
         click.echo("\nPlease answer each question honestly based on how you've been feeling recently.\n")
         
         responses = {}
+        scores = array.array('i')  # raw item scores, parallel to responses
         
         # Administer questions
         for i, question in enumerate(assessment_data['questions'], 1):
@@ -567,12 +738,14 @@ def run_assessment(patient_id, assessment_type):
                 try:
                     response = click.prompt("Your answer (number)", type=int)
                     if 0 <= response < len(question['options']):
+                        # Store the chosen option index only; question and
+                        # option text come from the assessment spec
+                        # (AssessmentSystem.expand_responses)
                         responses[f"question_{i}"] = {
-                            'question': question['text'],
-                            'response_index': response,
-                            'response_text': question['options'][response],
+                            'r': response,
                             'score': question['scores'][response]
                         }
+                        scores.append(question['scores'][response])
                         break
                     else:
                         click.echo(f"Please enter a number between 0 and {len(question['options'])-1}")
@@ -580,7 +753,7 @@ def run_assessment(patient_id, assessment_type):
                     click.echo("Please enter a valid number")
         
         # Score assessment
-        total_score = sum(r['score'] for r in responses.values())
+        total_score = sum(scores)
         severity = cli.assessment_system.calculate_severity(assessment_type, total_score)
         interpretation = cli.assessment_system.get_interpretation(assessment_type, total_score)
         
@@ -602,7 +775,8 @@ def run_assessment(patient_id, assessment_type):
         click.echo(f"Assessment ID: {assessment_id}")
         
         # Check for risk factors
-        if 'suicide' in interpretation.lower() or severity in ['severe', 'high']:
+        interpretation_lc = interpretation.casefold()
+        if severity in _HIGH_RISK_SEVERITIES or any(k in interpretation_lc for k in _RISK_KEYWORDS):
             click.echo(f"\n🚨 WARNING: High risk indicators detected!")
             click.echo(f"Consider immediate clinical intervention and safety planning.")
         
@@ -619,6 +793,8 @@ def run_assessment(patient_id, assessment_type):
 @click.option('--limit', default=10, help='Maximum number of assessments to show')
 def assessment_history(patient_id, assessment_type, limit):
     """View assessment history for a patient"""
+    from tabulate import tabulate
+    
     try:
         query = "SELECT * FROM assessments WHERE patient_id = ?"
         params = [patient_id]
@@ -731,7 +907,7 @@ def create_backup(description):
 
 @admin.command('export')
 @click.argument('patient_id', type=int)
-@click.option('--format', 'export_format', type=click.Choice(['json', 'csv']), default='json')
+@click.option('--format', 'export_format', type=click.Choice(['json', 'ndjson', 'csv']), default='json')
 def export_patient(patient_id, export_format):
     """Export patient data"""
     try:
@@ -748,47 +924,35 @@ def export_patient(patient_id, export_format):
 
 @admin.command('report')
 @click.option('--save', is_flag=True, help='Save report to file')
-def system_report(save):
+@click.option('--fresh', is_flag=True, help='Rebuild the report instead of using a recent cached one')
+def system_report(save, fresh):
     """Generate system usage report"""
     try:
         click.echo("🔄 Generating system report...")
         
-        report = generate_system_report()
+        # A saved report is an archive, so it is always rebuilt
+        report, age = get_system_report(max_age=0) if save or fresh else get_system_report()
         
         # Display report
-        click.echo(f"\n📊 System Usage Report")
-        click.echo("=" * 50)
-        click.echo(f"Generated: {format_datetime(report['generated_at'], 'friendly')}")
-        
-        click.echo(f"\n👥 Patient Statistics:")
-        patient_stats = report['patient_stats']
-        click.echo(f"   Total Patients: {patient_stats['total_patients']}")
-        click.echo(f"   Active Patients (30 days): {patient_stats['active_patients_30_days']}")
-        click.echo(f"   Activity Rate: {patient_stats['patient_activity_rate']}%")
-        
-        click.echo(f"\n💬 Session Statistics:")
-        session_stats = report['session_stats']
-        click.echo(f"   Total Sessions: {session_stats['total_sessions']}")
-        click.echo(f"   Sessions (last week): {session_stats['sessions_last_week']}")
-        click.echo(f"   Avg Sessions/Patient: {session_stats['avg_sessions_per_patient']}")
-        
-        click.echo(f"\n📋 Assessment Statistics:")
-        assessment_stats = report['assessment_stats']
-        click.echo(f"   Total Assessments: {assessment_stats['total_assessments']}")
-        click.echo(f"  Avg Assessments/Patient: {assessment_stats['avg_assessments_per_patient']}")
-        
-        click.echo(f"\n🏥 System Health:")
         health = report['system_health']
-        click.echo(f"   Status: {health['status'].upper()}")
-        click.echo(f"   Warnings: {len(health.get('warnings', []))}")
-        click.echo(f"   Errors: {len(health.get('errors', []))}")
+        click.echo(_REPORT_TEMPLATE.format(
+            generated=format_datetime(report['generated_at'], 'friendly'),
+            p=report['patient_stats'],
+            s=report['session_stats'],
+            a=report['assessment_stats'],
+            status=health['status'].upper(),
+            warnings=len(health.get('warnings', [])),
+            errors=len(health.get('errors', []))
+        ))
+        
+        if age >= 1:
+            click.echo(f"\nℹ️  Cached report, {int(age)}s old (use --fresh to rebuild)")
         
         if save:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             report_file = f"system_report_{timestamp}.json"
             
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2, default=str)
+            save_report(report, report_file)
             
             click.echo(f"\n💾 Report saved to: {report_file}")
         
@@ -814,13 +978,11 @@ def create_goal(patient_id, goal_type, description, target_date, criteria):
     """Create a new treatment goal"""
     try:
         # Verify patient exists
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        if not patient_data:
+        patient = _patient(patient_id)
+        if not patient:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
         
-        patient = patient_data[0]
-        
         # Create goal
         goal_id = cli.goal_manager.create_goal(
             patient_id=patient_id,
@@ -847,39 +1009,61 @@ def create_goal(patient_id, goal_type, description, target_date, criteria):
 @click.argument('patient_id', type=int)
 @click.option('--status', type=click.Choice(['active', 'achieved', 'modified', 'discontinued']),
               help='Filter by goal status')
-def list_goals(patient_id, status):
+@click.option('--limit', default=50, help='Maximum number of goals to show')
+@click.option('--offset', default=0, help='Number of goals to skip')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'json', 'tsv']), default='table',
+              help='Output format (json/tsv emit one record per line)')
+def list_goals(patient_id, status, limit, offset, output_format):
     """List goals for a patient"""
     try:
-        query = "SELECT * FROM treatment_goals WHERE patient_id = ?"
+        where = " WHERE patient_id = ?"
         params = [patient_id]
         
         if status:
-            query += " AND status = ?"
+            where += " AND status = ?"
             params.append(status)
         
-        query += " ORDER BY created_date DESC"
+        # Column order matches the table layout so rows unpack positionally;
+        # only the table truncates the description, scripts get the full text
+        if output_format == 'table':
+            description = """substr(goal_description, 1, 50) ||
+                   CASE WHEN length(goal_description) > 50 THEN '...' ELSE '' END"""
+        else:
+            description = "goal_description"
+        
+        query = """
+        SELECT id, goal_type,
+               """ + description + """,
+               current_progress, status, target_date
+        FROM treatment_goals""" + where + " ORDER BY created_date DESC LIMIT ? OFFSET ?"
+        
+        goals = cli.db.execute_query_rows(query, params + [limit, offset])
         
-        goals = cli.db.execute_query(query, params)
+        if output_format != 'table':
+            _write_records(('id', 'goal_type', 'goal_description', 'current_progress', 'status', 'target_date'),
+                           goals, output_format)
+            return
         
         if not goals:
             click.echo("No goals found.")
             return
         
+        from tabulate import tabulate
+        
+        total = cli.db.execute_query(
+            "SELECT COUNT(*) AS total FROM treatment_goals" + where, params
+        )[0]['total']
+        
         # Prepare table data
-        table_data = []
-        for goal in goals:
-            table_data.append([
-                goal['id'],
-                goal['goal_type'],
-                goal['goal_description'][:50] + "..." if len(goal['goal_description']) > 50 else goal['goal_description'],
-                f"{goal['current_progress']}%",
-                goal['status'],
-                format_datetime(goal['target_date'], 'date_only')
-            ])
+        fmt = format_datetime
+        table_data = [
+            (goal_id, goal_type, description, f"{progress}%", goal_status, fmt(target_date, 'date_only'))
+            for goal_id, goal_type, description, progress, goal_status, target_date in goals
+        ]
         
         headers = ['ID', 'Type', 'Description', 'Progress', 'Status', 'Target Date']
         click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
-        click.echo(f"\nShowing {len(goals)} goals")
+        click.echo(_page_footer(offset, len(goals), total, "goals"))
         
     except Exception as e:
         click.echo(f"❌ Error listing goals: {e}")
@@ -894,13 +1078,8 @@ def list_goals(patient_id, status):
 def update_goal(goal_id, progress, status, notes):
     """Update goal progress"""
     try:
-        # Get current goal
-        goal_data = cli.db.execute_query("SELECT * FROM treatment_goals WHERE id = ?", (goal_id,))
-        if not goal_data:
-            click.echo(f"❌ Goal {goal_id} not found.")
-            return
-        
-        goal = goal_data[0]
+        # One clock read shared by the notes stamp and last_updated
+        now = datetime.now()
         
         # Update goal
         update_data = {}
@@ -915,36 +1094,41 @@ def update_goal(goal_id, progress, status, notes):
             update_data['status'] = status
         
         if notes:
-            # Append to existing notes
-            existing_notes = goal.get('notes', '') or ''
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-            new_notes = f"{existing_notes}\n[{timestamp}] {notes}".strip()
-            update_data['notes'] = new_notes
-        
-        if update_data:
-            update_data['last_updated'] = datetime.now().isoformat()
-            
-            # Build update query
-            set_clause = ", ".join([f"{key} = ?" for key in update_data.keys()])
-            query = f"UPDATE treatment_goals SET {set_clause} WHERE id = ?"
-            params = list(update_data.values()) + [goal_id]
-            
-            cli.db.execute_update(query, params)
-            
-            click.echo(f"✅ Goal updated successfully!")
-            
-            if progress is not None:
-                click.echo(f"Progress: {progress}%")
-                if progress == 100:
-                    click.echo("🎉 Goal completed! Consider setting as 'achieved' status.")
-            
-            if status:
-                click.echo(f"Status: {status}")
-            
-            log_action(f"Goal updated: {goal['goal_description'][:50]}", "goal_management", 
-                      patient_id=goal['patient_id'], additional_data=update_data)
-        else:
-            click.echo("No updates specified.")
+            # Appended to the existing notes by the UPDATE itself
+            update_data['notes'] = f"\n[{now:%Y-%m-%d %H:%M}] {notes}"
+        
+        if not update_data:
+            if not cli.db.execute_query("SELECT 1 FROM treatment_goals WHERE id = ? LIMIT 1", (goal_id,)):
+                click.echo(f"❌ Goal {goal_id} not found.")
+            else:
+                click.echo("No updates specified.")
+            return
+        
+        update_data['last_updated'] = now.isoformat()
+        
+        # Pick the fixed statement for this combination of fields
+        fields = tuple(f for f in _GOAL_UPDATE_FIELDS if f in update_data)
+        params = [update_data[f] for f in fields] + [update_data['last_updated'], goal_id]
+        
+        goal_data = cli.db.execute_query(_GOAL_UPDATE_SQL[fields], params)
+        if not goal_data:
+            click.echo(f"❌ Goal {goal_id} not found.")
+            return
+        
+        goal = goal_data[0]
+        
+        click.echo(f"✅ Goal updated successfully!")
+        
+        if progress is not None:
+            click.echo(f"Progress: {progress}%")
+            if progress == 100:
+                click.echo("🎉 Goal completed! Consider setting as 'achieved' status.")
+        
+        if status:
+            click.echo(f"Status: {status}")
+        
+        log_action(f"Goal updated: {goal['goal_description'][:50]}", "goal_management", 
+                  patient_id=goal['patient_id'], additional_data=update_data)
         
     except Exception as e:
         click.echo(f"❌ Error updating goal: {e}")
@@ -969,35 +1153,31 @@ def assign_homework(patient_id, session_id, assignment_type, description, instru
     """Assign homework to a patient"""
     try:
         # Verify patient and session exist
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        if not patient_data:
+        patient, session = _verify_patient_session(patient_id, session_id)
+        if not patient:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
         
-        session_data = cli.db.execute_query("SELECT * FROM sessions WHERE id = ? AND patient_id = ?", 
-                                           (session_id, patient_id))
-        if not session_data:
+        if not session:
             click.echo(f"❌ Session {session_id} not found for patient {patient_id}.")
             return
         
-        patient = patient_data[0]
-        
-        # Calculate due date
-        due_date = (datetime.now() + timedelta(days=due_days)).isoformat()
-        
-        # Create homework assignment
-        assignment_id = cli.db.execute_update('''
+        # Create homework assignment; SQLite stamps the assigned and due dates
+        created = cli.db.execute_query(f'''
             INSERT INTO homework_assignments 
             (patient_id, session_id, assignment_type, description, instructions, 
              assigned_date, due_date, completed, completion_notes, effectiveness_rating)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, {_SQL_NOW},
+                    strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime', ?), 0, NULL, NULL)
+            RETURNING id, due_date
         ''', (
             patient_id, session_id, assignment_type, description, instructions or description,
-            datetime.now().isoformat(), due_date, False, None, None
-        ))
+            f"{due_days:+d} days"
+        ))[0]
+        due_date = created['due_date']
         
         click.echo(f"✅ Homework assigned successfully!")
-        click.echo(f"Assignment ID: {assignment_id}")
+        click.echo(f"Assignment ID: {created['id']}")
         click.echo(f"Patient: {patient['name']}")
         click.echo(f"Type: {assignment_type}")
         click.echo(f"Description: {description}")
@@ -1014,55 +1194,73 @@ def assign_homework(patient_id, session_id, assignment_type, description, instru
 @click.argument('patient_id', type=int)
 @click.option('--status', type=click.Choice(['pending', 'completed', 'overdue']),
               help='Filter by completion status')
-def list_homework(patient_id, status):
+@click.option('--limit', default=50, help='Maximum number of assignments to show')
+@click.option('--offset', default=0, help='Number of assignments to skip')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'json', 'tsv']), default='table',
+              help='Output format (json/tsv emit one record per line)')
+def list_homework(patient_id, status, limit, offset, output_format):
     """List homework assignments for a patient"""
     try:
-        query = "SELECT * FROM homework_assignments WHERE patient_id = ?"
+        now = datetime.now().isoformat()
+        where = " WHERE patient_id = ?"
         params = [patient_id]
         
         if status == 'pending':
-            query += " AND completed = FALSE AND due_date > ?"
-            params.append(datetime.now().isoformat())
+            where += " AND completed = FALSE AND due_date > ?"
+            params.append(now)
         elif status == 'completed':
-            query += " AND completed = TRUE"
+            where += " AND completed = TRUE"
         elif status == 'overdue':
-            query += " AND completed = FALSE AND due_date <= ?"
-            params.append(datetime.now().isoformat())
-        
-        query += " ORDER BY due_date DESC"
+            where += " AND completed = FALSE AND due_date <= ?"
+            params.append(now)
+        
+        # Column order matches the table layout so rows unpack positionally;
+        # only the table truncates the description, scripts get the full text
+        if output_format == 'table':
+            description = """substr(description, 1, 40) ||
+                   CASE WHEN length(description) > 40 THEN '...' ELSE '' END"""
+        else:
+            description = "description"
         
-        assignments = cli.db.execute_query(query, params)
+        query = """
+        SELECT id, assignment_type,
+               """ + description + """,
+               due_date,
+               CASE WHEN completed THEN 'completed'
+                    WHEN due_date <= ? THEN 'overdue'
+                    ELSE 'pending' END AS derived_status,
+               effectiveness_rating
+        FROM homework_assignments""" + where + " ORDER BY due_date DESC LIMIT ? OFFSET ?"
+        
+        assignments = cli.db.execute_query_rows(query, [now] + params + [limit, offset])
+        
+        if output_format != 'table':
+            _write_records(('id', 'assignment_type', 'description', 'due_date', 'status', 'effectiveness_rating'),
+                           assignments, output_format)
+            return
         
         if not assignments:
             click.echo("No homework assignments found.")
             return
         
+        from tabulate import tabulate
+        
+        total = cli.db.execute_query(
+            "SELECT COUNT(*) AS total FROM homework_assignments" + where, params
+        )[0]['total']
+        
         # Prepare table data
-        table_data = []
-        for assignment in assignments:
-            # Determine status
-            if assignment['completed']:
-                status_icon = "✅"
-                status_text = "Completed"
-            elif assignment['due_date'] <= datetime.now().isoformat():
-                status_icon = "⏰"
-                status_text = "Overdue"
-            else:
-                status_icon = "📝"
-                status_text = "Pending"
-            
-            table_data.append([
-                assignment['id'],
-                assignment['assignment_type'],
-                assignment['description'][:40] + "..." if len(assignment['description']) > 40 else assignment['description'],
-                format_datetime(assignment['due_date'], 'date_only'),
-                f"{status_icon} {status_text}",
-                assignment['effectiveness_rating'] or "N/A"
-            ])
+        fmt = format_datetime
+        display = _HOMEWORK_STATUS_DISPLAY
+        table_data = [
+            (hw_id, hw_type, description, fmt(due_date, 'date_only'),
+             display[derived_status], rating or "N/A")
+            for hw_id, hw_type, description, due_date, derived_status, rating in assignments
+        ]
         
         headers = ['ID', 'Type', 'Description', 'Due Date', 'Status', 'Rating']
         click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
-        click.echo(f"\nShowing {len(assignments)} assignments")
+        click.echo(_page_footer(offset, len(assignments), total, "assignments"))
         
     except Exception as e:
         click.echo(f"❌ Error listing homework: {e}")
@@ -1094,11 +1292,11 @@ def complete_homework(assignment_id, notes, rating):
             return
         
         # Mark as completed
-        cli.db.execute_update('''
+        cli.db.execute_update(f'''
             UPDATE homework_assignments 
-            SET completed = TRUE, completion_date = ?, completion_notes = ?, effectiveness_rating = ?
+            SET completed = TRUE, completion_date = {_SQL_NOW}, completion_notes = ?, effectiveness_rating = ?
             WHERE id = ?
-        ''', (datetime.now().isoformat(), notes, rating, assignment_id))
+        ''', (notes, rating, assignment_id))
         
         click.echo(f"✅ Homework assignment completed!")
         click.echo(f"Assignment: {assignment['assignment_type']}")
@@ -1128,20 +1326,15 @@ def create_note(patient_id, session_id, note_type):
     """Create a progress note"""
     try:
         # Verify patient and session
-        patient_data = cli.db.execute_query("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        if not patient_data:
+        patient, session = _verify_patient_session(patient_id, session_id)
+        if not patient:
             click.echo(f"❌ Patient {patient_id} not found.")
             return
         
-        session_data = cli.db.execute_query("SELECT * FROM sessions WHERE id = ? AND patient_id = ?", 
-                                           (session_id, patient_id))
-        if not session_data:
+        if not session:
             click.echo(f"❌ Session {session_id} not found for patient {patient_id}.")
             return
         
-        patient = patient_data[0]
-        session = session_data[0]
-        
         click.echo(f"📝 Creating {note_type} note for {patient['name']}")
         click.echo(f"Session Date: {format_datetime(session['session_date'], 'friendly')}")
         
@@ -1152,26 +1345,20 @@ def create_note(patient_id, session_id, note_type):
             assessment = click.prompt("Assessment (clinical impression)")
             plan = click.prompt("Plan (treatment plan)")
             
-            # Create SOAP note
-            note_id = cli.db.execute_update('''
-                INSERT INTO progress_notes 
-                (patient_id, session_id, note_type, subjective, objective, assessment, plan, 
-                 created_date, created_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (patient_id, session_id, note_type, subjective, objective, assessment, plan,
-                  datetime.now().isoformat(), "System User"))
+            note_fields = (subjective, objective, assessment, plan)
             
         else:
             # Simple progress note
             content = click.prompt("Progress note content")
-            
-            note_id = cli.db.execute_update('''
-                INSERT INTO progress_notes 
-                (patient_id, session_id, note_type, subjective, objective, assessment, plan,
-                 created_date, created_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (patient_id, session_id, note_type, content, "", "", "",
-                  datetime.now().isoformat(), "System User"))
+            note_fields = (content, "", "", "")
+        
+        note_id = cli.db.execute_query(f'''
+            INSERT INTO progress_notes 
+            (patient_id, session_id, note_type, subjective, objective, assessment, plan, 
+             created_date, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, {_SQL_NOW}, 'System User')
+            RETURNING id
+        ''', (patient_id, session_id, note_type, *note_fields))[0]['id']
         
         click.echo(f"✅ Progress note created successfully!")
         click.echo(f"Note ID: {note_id}")
@@ -1186,11 +1373,14 @@ def create_note(patient_id, session_id, note_type):
 @docs.command('view')
 @click.argument('patient_id', type=int)
 @click.option('--limit', default=5, help='Number of recent notes to show')
-def view_notes(patient_id, limit):
+@click.option('--format', 'output_format', type=click.Choice(['table', 'json', 'tsv']), default='table',
+              help='Output format (json/tsv emit one record per line)')
+def view_notes(patient_id, limit, output_format):
     """View recent progress notes for a patient"""
     try:
         notes = cli.db.execute_query('''
-            SELECT pn.*, s.session_date 
+            SELECT pn.id, pn.note_type, pn.created_date, pn.created_by,
+                   pn.subjective, pn.objective, pn.assessment, pn.plan, s.session_date
             FROM progress_notes pn
             JOIN sessions s ON pn.session_id = s.id
             WHERE pn.patient_id = ?
@@ -1198,29 +1388,31 @@ def view_notes(patient_id, limit):
             LIMIT ?
         ''', (patient_id, limit))
         
+        if output_format != 'table':
+            if notes:
+                _write_records(tuple(notes[0]), (tuple(note.values()) for note in notes), output_format)
+            return
+        
         if not notes:
             click.echo("No progress notes found.")
             return
         
-        patient_data = cli.db.execute_query("SELECT name FROM patients WHERE id = ?", (patient_id,))
-        patient_name = patient_data[0]['name'] if patient_data else f"Patient {patient_id}"
-        
-        click.echo(f"📋 Progress Notes for {patient_name}")
-        click.echo("=" * 60)
-        
-        for note in notes:
-            click.echo(f"\nNote ID: {note['id']} | Type: {note['note_type']} | Session: {format_datetime(note['session_date'], 'date_only')}")
-            click.echo(f"Created: {format_datetime(note['created_date'], 'friendly')} by {note['created_by']}")
-            click.echo("-" * 40)
-            
-            if note['note_type'] == 'SOAP':
-                click.echo(f"S: {note['subjective']}")
-                click.echo(f"O: {note['objective']}")
-                click.echo(f"A: {note['assessment']}")
-                click.echo(f"P: {note['plan']}")
-            else:
-                click.echo(f"Content: {note['subjective']}")
-        
+        patient = _patient(patient_id)
+        patient_name = patient['name'] if patient else f"Patient {patient_id}"
+        
+        # Render every note up front and emit them in a single write
+        fmt = format_datetime
+        blocks = [f"📋 Progress Notes for {patient_name}\n{_SEP60}\n"]
+        blocks.extend(
+            _NOTE_FMT.get(note['note_type'], _NOTE_FMT[None]).format(
+                session=fmt(note['session_date'], 'date_only'),
+                created=fmt(note['created_date'], 'friendly'),
+                **note
+            )
+            for note in notes
+        )
+        click.echo("".join(blocks), nl=False)
+
     except Exception as e:
         click.echo(f"❌ Error viewing notes: {e}")
 
@@ -1273,25 +1465,36 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 sys.excepthook = handle_exception
 
 
+# The interpreter version can't change at runtime, so check it once
+_PYTHON_SUPPORTED = sys.version_info >= (3, 9)
+
+# UPDATE/INSERT ... RETURNING (goal update, homework assign, note create)
+# needs SQLite 3.35+
+_SQLITE_RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35)
+
+
 def validate_environment():
     """Validate environment before starting"""
     issues = []
     
+    # Known-good deployments (e.g. containers) can opt out of the checks
+    if os.getenv('THERAPY_SKIP_ENV') == '1':
+        return issues
+    
     # Check Python version
-    if sys.version_info < (3, 8):
-        issues.append("Python 3.8 or higher required")
+    if not _PYTHON_SUPPORTED:
+        issues.append("Python 3.9 or higher required")
+    
+    # Check the SQLite library Python is linked against
+    if not _SQLITE_RETURNING_SUPPORTED:
+        issues.append(f"SQLite 3.35 or higher required (found {sqlite3.sqlite_version})")
     
     # Check for Gemini API key
     #if not os.getenv('GEMINI_API_KEY'):
     #    issues.append("GEMINI_API_KEY environment variable not set")
     
     # Check write permissions
-    try:
-        test_file = '.write_test'
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-    except:
+    if not os.access(os.getcwd(), os.W_OK):
         issues.append("No write permission in current directory")
     
     return issues
@@ -4,13 +4,56 @@ AI Therapy System - Data Models and Validation
 Comprehensive data models with validation for all system entities
 """
 
+import sys
+import copy
 import json
+import bisect
+import functools
+from itertools import chain
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Any, Optional, Union, Tuple
-from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence, Union, Tuple
+from dataclasses import dataclass, field, fields, MISSING
 from enum import Enum
 import re
-from abc import ABC, abstractmethod
+import string
+from abc import abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Hot-path callables bound once to skip the attribute lookups on each call
+_now = datetime.now
+_fromiso = datetime.fromisoformat
+_td = timedelta
+
+try:
+    import orjson
+except ImportError:
+    # Optional fast JSON encoder; stdlib json is used when unavailable
+    orjson = None
+
+
+# Contact info patterns, compiled once rather than on every validation
+_PHONE_RE = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# Character classes of the email check (local@host.tld)
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_HOST_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+_EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
+
+
+def _is_valid_email(contact: str) -> bool:
+    """Linear-time equivalent of ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}$"""
+    if contact.endswith('\n'):
+        contact = contact[:-1]  # '$' also matches before a trailing newline
+    
+    local, at, domain = contact.partition('@')
+    if not at or not local or not _EMAIL_LOCAL_CHARS.issuperset(local):
+        return False
+    
+    # The TLD can't contain '.', so it always follows the last dot
+    host, dot, tld = domain.rpartition('.')
+    return (bool(dot) and bool(host) and len(tld) >= 2
+            and _EMAIL_TLD_CHARS.issuperset(tld) and _EMAIL_HOST_CHARS.issuperset(host))
 
 
 class ValidationError(Exception):
@@ -73,19 +116,216 @@ class AssessmentType(Enum):
     CUSTOM = "custom"
 
 
+def _choices(label: str, values) -> Tuple[frozenset, str]:
+    """Allowed values as a set for membership tests plus the ready-made error message"""
+    values = list(values)
+    return frozenset(values), f"{label} must be one of: {', '.join(values)}"
+
+
+def _enum_choices(label: str, enum_cls) -> Tuple[Dict[Any, Enum], str]:
+    """Like _choices, but probes the enum's own value->member map instead of a copy"""
+    return enum_cls._value2member_map_, _choices(label, (m.value for m in enum_cls))[1]
+
+
+# Allowed values checked by validate() and their error messages, built once at import
+_VALID_GENDERS, _ERR_GENDER = _enum_choices("Gender", Gender)
+_VALID_RISK_LEVELS, _ERR_RISK_LEVEL = _enum_choices("Risk level", RiskLevel)
+_VALID_MODALITIES, _ERR_THERAPY_MODALITY = _enum_choices("Therapy modality", TherapyModality)
+_ERR_PRIMARY_MODALITY = _enum_choices("Primary modality", TherapyModality)[1]
+_VALID_SESSION_TYPES, _ERR_SESSION_TYPE = _enum_choices("Session type", SessionType)
+_VALID_ASSESSMENT_TYPES, _ERR_ASSESSMENT_TYPE = _enum_choices("Assessment type", AssessmentType)
+_VALID_DIAGNOSIS_STATUSES, _ERR_DIAGNOSIS_STATUS = _enum_choices("Status", DiagnosisStatus)
+_VALID_SEVERITIES, _ERR_SEVERITY = _choices(
+    "Severity", ["mild", "moderate", "severe", "in_partial_remission", "in_full_remission"])
+_VALID_GOAL_TYPES, _ERR_GOAL_TYPE = _choices(
+    "Goal type", ["symptom", "functional", "behavioral", "interpersonal", "cognitive"])
+_VALID_GOAL_STATUSES, _ERR_GOAL_STATUS = _choices(
+    "Status", ["active", "achieved", "modified", "discontinued", "on_hold"])
+_VALID_NOTE_TYPES, _ERR_NOTE_TYPE = _choices(
+    "Note type", ["SOAP", "progress", "crisis", "assessment", "treatment_plan", "discharge"])
+_VALID_PLAN_STATUSES, _ERR_PLAN_STATUS = _choices(
+    "Status", ["active", "completed", "modified", "on_hold", "discontinued"])
+_VALID_FREQUENCIES, _ERR_FREQUENCY = _choices(
+    "Session frequency", ["weekly", "biweekly", "monthly", "as_needed"])
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_iso(value: str) -> bool:
+    """Check that a string parses as an ISO-8601 date or datetime (memoized)"""
+    # Every ISO form starts with a four-digit year; anything else is rejected
+    # here without the cost of raising and catching a ValueError
+    if not value[:4].isdigit():
+        return False
+    
+    try:
+        _fromiso(value)
+        return True
+    except ValueError:
+        return False
+
+
+# Local extended-format dates/datetimes (no UTC offset), whose string order
+# matches the order of the datetimes they encode
+_SORTABLE_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}(T\d{2}(:\d{2}(:\d{2}(\.\d+)?)?)?)?')
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_sortable_iso(value: str) -> bool:
+    """Check that a valid ISO string can be compared as a plain string (memoized)"""
+    return _SORTABLE_ISO_RE.fullmatch(value) is not None and _is_valid_iso(value)
+
+
+# Severity bands per assessment type as (lowest score, highest score, label)
+_SEVERITY_BANDS = {
+    AssessmentType.PHQ9.value: (
+        (0, 4, "Minimal"),
+        (5, 9, "Mild"),
+        (10, 14, "Moderate"),
+        (15, 19, "Moderately Severe"),
+        (20, 27, "Severe")
+    ),
+    AssessmentType.GAD7.value: (
+        (0, 4, "Minimal"),
+        (5, 9, "Mild"),
+        (10, 14, "Moderate"),
+        (15, 21, "Severe")
+    ),
+    AssessmentType.PCL5.value: (
+        (0, 32, "Below Threshold"),
+        (33, 49, "Probable PTSD"),
+        (50, 80, "High Probability PTSD")
+    )
+}
+
+# Valid total score range per assessment type
+_SCORE_RANGES = {
+    AssessmentType.PHQ9.value: (0, 27),
+    AssessmentType.GAD7.value: (0, 21),
+    AssessmentType.PCL5.value: (0, 80),
+    AssessmentType.ORS.value: (0, 40),
+    AssessmentType.SRS.value: (0, 40)
+}
+
+# Clinical significance cut-off per assessment type as (threshold, lower_is_worse)
+_CLINICAL_THRESHOLDS = {
+    AssessmentType.PHQ9.value: (10, False),
+    AssessmentType.GAD7.value: (10, False),
+    AssessmentType.PCL5.value: (33, False),
+    AssessmentType.ORS.value: (25, True),  # Below this indicates distress
+    AssessmentType.SRS.value: (36, True)   # Below this indicates alliance issues
+}
+
+# The tables above laid out by AssessmentType position, so one index lookup
+# serves every per-type check; severity entries are parallel
+# (lower bounds, upper bounds, labels) tuples for bisect
+_ASSESSMENT_IDX = {a.value: i for i, a in enumerate(AssessmentType)}
+_SCORE_RANGE_TBL = tuple(_SCORE_RANGES.get(a.value) for a in AssessmentType)
+_SEVERITY_TBL = tuple(
+    tuple(zip(*_SEVERITY_BANDS[a.value])) if a.value in _SEVERITY_BANDS else None
+    for a in AssessmentType
+)
+_CLIN_THRESH_TBL = tuple(_CLINICAL_THRESHOLDS.get(a.value) for a in AssessmentType)
+
+
+def _severity_label(assessment_type: str, score: int) -> str:
+    """Severity band label for a score, or "Unknown" outside the type's bands"""
+    idx = _ASSESSMENT_IDX.get(assessment_type)
+    table = _SEVERITY_TBL[idx] if idx is not None else None
+    if table is not None:
+        lows, highs, labels = table
+        i = bisect.bisect_right(lows, score) - 1
+        if i >= 0 and score <= highs[i]:
+            return labels[i]
+    
+    return "Unknown"
+
+
+def _is_significant(assessment_type: str, score: int) -> bool:
+    """Whether a score crosses the type's clinical threshold"""
+    idx = _ASSESSMENT_IDX.get(assessment_type)
+    entry = _CLIN_THRESH_TBL[idx] if idx is not None else None
+    if entry is not None:
+        threshold, lower_is_worse = entry
+        if lower_is_worse:
+            return score < threshold  # Lower scores indicate problems
+        else:
+            return score >= threshold  # Higher scores indicate problems
+    
+    return False
+
+
+# Models are slotted where dataclasses support it (3.10+): no per-instance
+# __dict__, so bulk-loaded records are smaller and attribute access is faster
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Dataclass field names of a model class, in declaration order"""
+    return tuple(f.name for f in fields(cls))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_defaults(cls: type) -> Tuple[Tuple[str, Any, Any], ...]:
+    """(name, default, default_factory) of each dataclass field of a model class"""
+    return tuple((f.name, f.default, f.default_factory) for f in fields(cls))
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_container_fields(cls: type) -> Dict[str, Any]:
+    """Fields defaulting to an empty list/dict, mapped to that factory"""
+    return {f.name: f.default_factory for f in fields(cls) if f.default_factory in (list, dict)}
+
+
+# Timestamp shared by every model built inside frozen_now()
+_NOW_OVERRIDE: ContextVar[Optional[str]] = ContextVar('_NOW_OVERRIDE', default=None)
+
+
+def _now_iso() -> str:
+    """Current time as an ISO string, or the frozen batch timestamp if set"""
+    now = _NOW_OVERRIDE.get()
+    return now if now is not None else _now().isoformat()
+
+
+@contextmanager
+def frozen_now():
+    """Stamp all models created in this block with a single timestamp"""
+    token = _NOW_OVERRIDE.set(_now().isoformat())
+    try:
+        yield
+    finally:
+        _NOW_OVERRIDE.reset(token)
+
+
 # Base Model Class
-@dataclass
-class BaseModel(ABC):
+@dataclass(**_DATACLASS_OPTIONS)
+class BaseModel:
     """Base model class with common functionality"""
-    
+
     id: Optional[int] = None
-    created_date: str = field(default_factory=lambda: datetime.now().isoformat())
-    last_updated: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_date: str = field(default_factory=_now_iso)
+    last_updated: str = field(default_factory=_now_iso)
+    
+    def __init_subclass__(cls):
+        # Checked once at class creation instead of through ABCMeta on every
+        # instantiation; no super() call since slots=True rebuilds this class
+        if cls.validate is BaseModel.validate:
+            raise TypeError(f"{cls.__name__} must define validate()")
     
     def __post_init__(self):
         """Post-initialization validation"""
         self.validate()
-    
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached when normal lookup fails, i.e. for an empty-container
+        # field that from_dict_trusted left unset; materialize it on first use
+        factory = _lazy_container_fields(type(self)).get(name)
+        if factory is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = factory()
+        setattr(self, name, value)
+        return value
+
     @abstractmethod
     def validate(self) -> None:
         """Validate model data - must be implemented by subclasses"""
@@ -93,24 +333,53 @@ class BaseModel(ABC):
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert model to dictionary"""
-        return asdict(self)
+        # Fields are flat values or containers of plain data, so copying the
+        # top-level lists/dicts is enough; avoids asdict's recursive deepcopy
+        result = {}
+        for name in _field_names(type(self)):
+            value = getattr(self, name)
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            result[name] = value
+        return result
     
     def to_json(self) -> str:
         """Convert model to JSON string"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), default=str,
+                                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
         return json.dumps(self.to_dict(), default=str, indent=2)
     
     def update_timestamp(self) -> None:
         """Update the last_updated timestamp"""
-        self.last_updated = datetime.now().isoformat()
+        self.last_updated = _now().isoformat()
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
         """Create model instance from dictionary"""
         return cls(**data)
+    
+    @classmethod
+    def from_dict_trusted(cls, data: Dict[str, Any]) -> 'BaseModel':
+        """Create model instance from already-validated data (e.g. database rows) without re-validating"""
+        obj = cls.__new__(cls)
+        for name, default, factory in _field_defaults(cls):
+            if name in data:
+                value = data[name]
+            elif default is not MISSING:
+                value = default
+            elif factory is list or factory is dict:
+                continue  # left unset; __getattr__ creates it on first access
+            elif factory is not MISSING:
+                value = factory()
+            else:
+                raise TypeError(f"{cls.__name__} missing required field: {name!r}")
+            setattr(obj, name, value)
+        return obj
 
 
 # Patient Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Patient(BaseModel):
     """Patient data model with comprehensive validation"""
     
@@ -140,6 +409,16 @@ class Patient(BaseModel):
     treatment_history: List[str] = field(default_factory=list)
     medication_history: List[str] = field(default_factory=list)
     
+    # Column order of the patients INSERT statement
+    _INSERT_COLS = (
+        'name', 'date_of_birth', 'gender', 'contact_info', 'emergency_contact',
+        'created_date', 'last_updated', 'risk_level', 'preferred_therapy_mode', 'notes'
+    )
+    
+    def insert_tuple(self) -> tuple:
+        """Return values for the patients INSERT in column order"""
+        return tuple(getattr(self, c) for c in self._INSERT_COLS)
+    
     def validate(self) -> None:
         """Validate patient data"""
         errors = []
@@ -153,12 +432,12 @@ class Patient(BaseModel):
         
         # Date of birth validation
         if self.date_of_birth:
-            if not self._is_valid_date(self.date_of_birth):
+            if not _is_valid_iso(self.date_of_birth):
                 errors.append("Invalid date of birth format. Use YYYY-MM-DD")
             else:
                 # Check if date is reasonable (not in future, not too old)
                 try:
-                    birth_date = datetime.fromisoformat(self.date_of_birth).date()
+                    birth_date = _fromiso(self.date_of_birth).date()
                     today = date.today()
                     
                     if birth_date > today:
@@ -172,19 +451,16 @@ class Patient(BaseModel):
                     errors.append("Invalid date of birth format")
         
         # Gender validation
-        valid_genders = [g.value for g in Gender]
-        if self.gender and self.gender not in valid_genders:
-            errors.append(f"Gender must be one of: {', '.join(valid_genders)}")
+        if self.gender and self.gender not in _VALID_GENDERS:
+            errors.append(_ERR_GENDER)
         
         # Risk level validation
-        valid_risk_levels = [r.value for r in RiskLevel]
-        if self.risk_level not in valid_risk_levels:
-            errors.append(f"Risk level must be one of: {', '.join(valid_risk_levels)}")
+        if self.risk_level not in _VALID_RISK_LEVELS:
+            errors.append(_ERR_RISK_LEVEL)
         
         # Therapy modality validation
-        valid_modalities = [m.value for m in TherapyModality]
-        if self.preferred_therapy_mode not in valid_modalities:
-            errors.append(f"Therapy modality must be one of: {', '.join(valid_modalities)}")
+        if self.preferred_therapy_mode not in _VALID_MODALITIES:
+            errors.append(_ERR_THERAPY_MODALITY)
         
         # Contact info validation (if provided)
         if self.contact_info and not self._is_valid_contact_info(self.contact_info):
@@ -193,24 +469,13 @@ class Patient(BaseModel):
         if errors:
             raise ValidationError(f"Patient validation errors: {'; '.join(errors)}")
     
-    def _is_valid_date(self, date_string: str) -> bool:
-        """Validate date format"""
-        try:
-            datetime.fromisoformat(date_string)
-            return True
-        except ValueError:
-            return False
-    
     def _is_valid_contact_info(self, contact: str) -> bool:
         """Basic validation for contact information"""
-        # Check for email pattern
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if re.search(email_pattern, contact):
+        # Cheap substring checks skip a regex that cannot possibly match
+        if '@' in contact and _is_valid_email(contact):
             return True
         
-        # Check for phone pattern (basic)
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        if re.search(phone_pattern, contact):
+        if any(ch.isdigit() for ch in contact) and _PHONE_RE.search(contact):
             return True
         
         return False
@@ -221,7 +486,7 @@ class Patient(BaseModel):
             return None
         
         try:
-            birth_date = datetime.fromisoformat(self.date_of_birth).date()
+            birth_date = _fromiso(self.date_of_birth).date()
             today = date.today()
             return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
         except ValueError:
@@ -233,12 +498,12 @@ class Patient(BaseModel):
 
 
 # Session Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Session(BaseModel):
     """Therapy session data model"""
     
     patient_id: int = 0
-    session_date: str = field(default_factory=lambda: datetime.now().isoformat())
+    session_date: str = field(default_factory=_now_iso)
     session_type: str = SessionType.CBT.value
     duration: int = 50  # minutes
     mood_before: Optional[int] = None  # 1-10 scale
@@ -278,36 +543,38 @@ class Session(BaseModel):
             errors.append("Patient ID must be a positive integer")
         
         # Session type validation
-        valid_session_types = [s.value for s in SessionType]
-        if self.session_type not in valid_session_types:
-            errors.append(f"Session type must be one of: {', '.join(valid_session_types)}")
+        if self.session_type not in _VALID_SESSION_TYPES:
+            errors.append(_ERR_SESSION_TYPE)
         
         # Duration validation
         if self.duration <= 0 or self.duration > 300:  # 5 hours max
             errors.append("Session duration must be between 1 and 300 minutes")
         
-        # Mood rating validations
-        for rating_field in ['mood_before', 'mood_after', 'energy_before', 'energy_after', 
-                           'anxiety_before', 'anxiety_after', 'therapeutic_alliance_rating', 'session_satisfaction']:
-            rating_value = getattr(self, rating_field)
-            if rating_value is not None and (rating_value < 1 or rating_value > 10):
-                errors.append(f"{rating_field} must be between 1 and 10")
-        
+        # Mood rating validations (1-10 scales)
+        if self.mood_before is not None and not 1 <= self.mood_before <= 10:
+            errors.append("mood_before must be between 1 and 10")
+        if self.mood_after is not None and not 1 <= self.mood_after <= 10:
+            errors.append("mood_after must be between 1 and 10")
+        if self.energy_before is not None and not 1 <= self.energy_before <= 10:
+            errors.append("energy_before must be between 1 and 10")
+        if self.energy_after is not None and not 1 <= self.energy_after <= 10:
+            errors.append("energy_after must be between 1 and 10")
+        if self.anxiety_before is not None and not 1 <= self.anxiety_before <= 10:
+            errors.append("anxiety_before must be between 1 and 10")
+        if self.anxiety_after is not None and not 1 <= self.anxiety_after <= 10:
+            errors.append("anxiety_after must be between 1 and 10")
+        if self.therapeutic_alliance_rating is not None and not 1 <= self.therapeutic_alliance_rating <= 10:
+            errors.append("therapeutic_alliance_rating must be between 1 and 10")
+        if self.session_satisfaction is not None and not 1 <= self.session_satisfaction <= 10:
+            errors.append("session_satisfaction must be between 1 and 10")
+
         # Date validation
-        if not self._is_valid_datetime(self.session_date):
+        if not _is_valid_iso(self.session_date):
             errors.append("Invalid session date format")
         
         if errors:
             raise ValidationError(f"Session validation errors: {'; '.join(errors)}")
     
-    def _is_valid_datetime(self, datetime_string: str) -> bool:
-        """Validate datetime format"""
-        try:
-            datetime.fromisoformat(datetime_string)
-            return True
-        except ValueError:
-            return False
-    
     def calculate_mood_change(self) -> Optional[int]:
         """Calculate mood change from before to after session"""
         if self.mood_before is not None and self.mood_after is not None:
@@ -338,14 +605,14 @@ class Session(BaseModel):
 
 
 # Assessment Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Assessment(BaseModel):
     """Assessment data model with comprehensive scoring"""
     
     patient_id: int = 0
     session_id: Optional[int] = None
     assessment_type: str = AssessmentType.PHQ9.value
-    assessment_date: str = field(default_factory=lambda: datetime.now().isoformat())
+    assessment_date: str = field(default_factory=_now_iso)
     
     # Assessment responses and scoring
     questions_responses: Dict[str, Any] = field(default_factory=dict)
@@ -379,26 +646,19 @@ class Assessment(BaseModel):
             errors.append("Patient ID must be a positive integer")
         
         # Assessment type validation
-        valid_assessment_types = [a.value for a in AssessmentType]
-        if self.assessment_type not in valid_assessment_types:
-            errors.append(f"Assessment type must be one of: {', '.join(valid_assessment_types)}")
+        if self.assessment_type not in _VALID_ASSESSMENT_TYPES:
+            errors.append(_ERR_ASSESSMENT_TYPE)
         
         # Score validation based on assessment type
-        score_ranges = {
-            AssessmentType.PHQ9.value: (0, 27),
-            AssessmentType.GAD7.value: (0, 21),
-            AssessmentType.PCL5.value: (0, 80),
-            AssessmentType.ORS.value: (0, 40),
-            AssessmentType.SRS.value: (0, 40)
-        }
-        
-        if self.assessment_type in score_ranges:
-            min_score, max_score = score_ranges[self.assessment_type]
+        idx = _ASSESSMENT_IDX.get(self.assessment_type)
+        score_range = _SCORE_RANGE_TBL[idx] if idx is not None else None
+        if score_range is not None:
+            min_score, max_score = score_range
             if not (min_score <= self.total_score <= max_score):
                 errors.append(f"Total score for {self.assessment_type} must be between {min_score} and {max_score}")
         
         # Date validation
-        if not self._is_valid_datetime(self.assessment_date):
+        if not _is_valid_iso(self.assessment_date):
             errors.append("Invalid assessment date format")
         
         # Completion time validation
@@ -408,67 +668,17 @@ class Assessment(BaseModel):
         if errors:
             raise ValidationError(f"Assessment validation errors: {'; '.join(errors)}")
     
-    def _is_valid_datetime(self, datetime_string: str) -> bool:
-        """Validate datetime format"""
-        try:
-            datetime.fromisoformat(datetime_string)
-            return True
-        except ValueError:
-            return False
-    
     def calculate_severity_level(self) -> str:
         """Calculate severity level based on assessment type and score"""
-        severity_mappings = {
-            AssessmentType.PHQ9.value: {
-                (0, 4): "Minimal",
-                (5, 9): "Mild",
-                (10, 14): "Moderate",
-                (15, 19): "Moderately Severe",
-                (20, 27): "Severe"
-            },
-            AssessmentType.GAD7.value: {
-                (0, 4): "Minimal",
-                (5, 9): "Mild",
-                (10, 14): "Moderate",
-                (15, 21): "Severe"
-            },
-            AssessmentType.PCL5.value: {
-                (0, 32): "Below Threshold",
-                (33, 49): "Probable PTSD",
-                (50, 80): "High Probability PTSD"
-            }
-        }
-        
-        if self.assessment_type in severity_mappings:
-            mapping = severity_mappings[self.assessment_type]
-            for (min_score, max_score), severity in mapping.items():
-                if min_score <= self.total_score <= max_score:
-                    return severity
-        
-        return "Unknown"
+        return _severity_label(self.assessment_type, self.total_score)
     
     def is_clinically_significant(self) -> bool:
         """Determine if score indicates clinical significance"""
-        clinical_thresholds = {
-            AssessmentType.PHQ9.value: 10,
-            AssessmentType.GAD7.value: 10,
-            AssessmentType.PCL5.value: 33,
-            AssessmentType.ORS.value: 25,  # Below this indicates distress
-            AssessmentType.SRS.value: 36   # Below this indicates alliance issues
-        }
-        
-        if self.assessment_type in clinical_thresholds:
-            threshold = clinical_thresholds[self.assessment_type]
-            if self.assessment_type in [AssessmentType.ORS.value, AssessmentType.SRS.value]:
-                return self.total_score < threshold  # Lower scores indicate problems
-            else:
-                return self.total_score >= threshold  # Higher scores indicate problems
-        
-        return False
+        return _is_significant(self.assessment_type, self.total_score)
 
 
 # Diagnosis Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Diagnosis(BaseModel):
     """Diagnosis data model with DSM-5 compliance"""
     
@@ -480,7 +690,7 @@ class Diagnosis(BaseModel):
     # Clinical details
     severity: str = ""  # mild, moderate, severe
     specifiers: List[str] = field(default_factory=list)
-    date_diagnosed: str = field(default_factory=lambda: datetime.now().isoformat())
+    date_diagnosed: str = field(default_factory=_now_iso)
     date_resolved: Optional[str] = None
     status: str = DiagnosisStatus.ACTIVE.value
     
@@ -512,15 +722,14 @@ class Diagnosis(BaseModel):
             errors.append("Diagnosis name must be at least 3 characters long")
         
         # Status validation
-        valid_statuses = [s.value for s in DiagnosisStatus]
-        if self.status not in valid_statuses:
-            errors.append(f"Status must be one of: {', '.join(valid_statuses)}")
+        if self.status not in _VALID_DIAGNOSIS_STATUSES:
+            errors.append(_ERR_DIAGNOSIS_STATUS)
         
         # Date validation
-        if not self._is_valid_date(self.date_diagnosed):
+        if not _is_valid_iso(self.date_diagnosed):
             errors.append("Invalid date diagnosed format")
         
-        if self.date_resolved and not self._is_valid_date(self.date_resolved):
+        if self.date_resolved and not _is_valid_iso(self.date_resolved):
             errors.append("Invalid date resolved format")
         
         # Confidence level validation
@@ -528,21 +737,12 @@ class Diagnosis(BaseModel):
             errors.append("Confidence level must be between 0.0 and 1.0")
         
         # Severity validation
-        valid_severities = ["mild", "moderate", "severe", "in_partial_remission", "in_full_remission"]
-        if self.severity and self.severity not in valid_severities:
-            errors.append(f"Severity must be one of: {', '.join(valid_severities)}")
+        if self.severity and self.severity not in _VALID_SEVERITIES:
+            errors.append(_ERR_SEVERITY)
         
         if errors:
             raise ValidationError(f"Diagnosis validation errors: {'; '.join(errors)}")
     
-    def _is_valid_date(self, date_string: str) -> bool:
-        """Validate date format"""
-        try:
-            datetime.fromisoformat(date_string)
-            return True
-        except ValueError:
-            return False
-    
     def is_active(self) -> bool:
         """Check if diagnosis is currently active"""
         return self.status == DiagnosisStatus.ACTIVE.value
@@ -550,14 +750,14 @@ class Diagnosis(BaseModel):
     def days_since_diagnosis(self) -> int:
         """Calculate days since diagnosis"""
         try:
-            diagnosis_date = datetime.fromisoformat(self.date_diagnosed)
-            return (datetime.now() - diagnosis_date).days
+            diagnosis_date = _fromiso(self.date_diagnosed)
+            return (_now() - diagnosis_date).days
         except ValueError:
             return 0
 
 
 # Treatment Goal Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TreatmentGoal(BaseModel):
     """Treatment goal data model with SMART goal structure"""
     
@@ -618,30 +818,20 @@ class TreatmentGoal(BaseModel):
             errors.append("Difficulty level must be between 1 and 5")
         
         # Status validation
-        valid_statuses = ["active", "achieved", "modified", "discontinued", "on_hold"]
-        if self.status not in valid_statuses:
-            errors.append(f"Status must be one of: {', '.join(valid_statuses)}")
+        if self.status not in _VALID_GOAL_STATUSES:
+            errors.append(_ERR_GOAL_STATUS)
         
         # Goal type validation
-        valid_goal_types = ["symptom", "functional", "behavioral", "interpersonal", "cognitive"]
-        if self.goal_type not in valid_goal_types:
-            errors.append(f"Goal type must be one of: {', '.join(valid_goal_types)}")
+        if self.goal_type not in _VALID_GOAL_TYPES:
+            errors.append(_ERR_GOAL_TYPE)
         
         # Date validation
-        if self.target_date and not self._is_valid_date(self.target_date):
+        if self.target_date and not _is_valid_iso(self.target_date):
             errors.append("Invalid target date format")
         
         if errors:
             raise ValidationError(f"Treatment goal validation errors: {'; '.join(errors)}")
     
-    def _is_valid_date(self, date_string: str) -> bool:
-        """Validate date format"""
-        try:
-            datetime.fromisoformat(date_string)
-            return True
-        except ValueError:
-            return False
-    
     def is_completed(self) -> bool:
         """Check if goal is completed"""
         return self.status == "achieved" or self.current_progress >= 100
@@ -652,16 +842,16 @@ class TreatmentGoal(BaseModel):
             return False
         
         try:
-            target = datetime.fromisoformat(self.target_date)
-            return datetime.now() > target
+            target = _fromiso(self.target_date)
+            return _now() > target
         except ValueError:
             return False
     
     def calculate_progress_rate(self) -> Optional[float]:
         """Calculate progress rate (progress per day since creation)"""
         try:
-            created = datetime.fromisoformat(self.created_date)
-            days_elapsed = (datetime.now() - created).days
+            created = _fromiso(self.created_date)
+            days_elapsed = (_now() - created).days
             
             if days_elapsed > 0:
                 return self.current_progress / days_elapsed
@@ -674,7 +864,7 @@ class TreatmentGoal(BaseModel):
     def add_progress_note(self, note: str, progress_update: int = None) -> None:
         """Add a progress note"""
         progress_entry = {
-            'date': datetime.now().isoformat(),
+            'date': _now().isoformat(),
             'note': note,
             'progress_at_time': progress_update or self.current_progress
         }
@@ -687,7 +877,7 @@ class TreatmentGoal(BaseModel):
 
 
 # Homework Assignment Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class HomeworkAssignment(BaseModel):
     """Homework assignment data model"""
     
@@ -699,7 +889,7 @@ class HomeworkAssignment(BaseModel):
     
     # Assignment details
     due_date: str = ""
-    assigned_date: str = field(default_factory=lambda: datetime.now().isoformat())
+    assigned_date: str = field(default_factory=_now_iso)
     estimated_time_minutes: int = 30
     difficulty_level: int = 2  # 1-5 scale
     
@@ -742,38 +932,32 @@ class HomeworkAssignment(BaseModel):
         if not (1 <= self.difficulty_level <= 5):
             errors.append("Difficulty level must be between 1 and 5")
         
-        # Rating validations
-        for rating_field in ['effectiveness_rating', 'difficulty_rating', 'helpfulness_rating']:
-            rating_value = getattr(self, rating_field)
-            if rating_value is not None and not (1 <= rating_value <= 5):
-                errors.append(f"{rating_field} must be between 1 and 5")
-        
+        # Rating validations (1-5 scales)
+        if self.effectiveness_rating is not None and not 1 <= self.effectiveness_rating <= 5:
+            errors.append("effectiveness_rating must be between 1 and 5")
+        if self.difficulty_rating is not None and not 1 <= self.difficulty_rating <= 5:
+            errors.append("difficulty_rating must be between 1 and 5")
+        if self.helpfulness_rating is not None and not 1 <= self.helpfulness_rating <= 5:
+            errors.append("helpfulness_rating must be between 1 and 5")
+
         # Date validations
-        if self.due_date and not self._is_valid_date(self.due_date):
+        if self.due_date and not _is_valid_iso(self.due_date):
             errors.append("Invalid due date format")
         
-        if self.completion_date and not self._is_valid_date(self.completion_date):
+        if self.completion_date and not _is_valid_iso(self.completion_date):
             errors.append("Invalid completion date format")
         
         if errors:
             raise ValidationError(f"Homework assignment validation errors: {'; '.join(errors)}")
     
-    def _is_valid_date(self, date_string: str) -> bool:
-        """Validate date format"""
-        try:
-            datetime.fromisoformat(date_string)
-            return True
-        except ValueError:
-            return False
-    
     def is_overdue(self) -> bool:
         """Check if assignment is overdue"""
         if not self.due_date or self.completed:
             return False
         
         try:
-            due = datetime.fromisoformat(self.due_date)
-            return datetime.now() > due
+            due = _fromiso(self.due_date)
+            return _now() > due
         except ValueError:
             return False
     
@@ -783,8 +967,8 @@ class HomeworkAssignment(BaseModel):
             return None
         
         try:
-            due = datetime.fromisoformat(self.due_date)
-            delta = due - datetime.now()
+            due = _fromiso(self.due_date)
+            delta = due - _now()
             return delta.days
         except ValueError:
             return None
@@ -792,15 +976,36 @@ class HomeworkAssignment(BaseModel):
     def mark_completed(self, completion_notes: str = "", time_spent: int = None) -> None:
         """Mark assignment as completed"""
         self.completed = True
-        self.completion_date = datetime.now().isoformat()
+        self.completion_date = _now().isoformat()
         self.completion_notes = completion_notes
         if time_spent is not None:
             self.time_spent_minutes = time_spent
         self.update_timestamp()
 
 
+def _stripped_len_at_least(text: str, n: int) -> bool:
+    """len(text.strip()) >= n without building the stripped copy"""
+    end = len(text)
+    if end < n:
+        return False
+    start = 0
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end - start >= n
+
+
+def _raise_errors(label: str, errors: Iterator[str], all_errors: bool) -> None:
+    """Raise ValidationError for the first message errors yields, or for all of them"""
+    first = next(errors, None)
+    if first is not None:
+        messages = [first, *errors] if all_errors else [first]
+        raise ValidationError(f"{label} validation errors: {'; '.join(messages)}")
+
+
 # Progress Note Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ProgressNote(BaseModel):
     """Progress note data model (SOAP format)"""
     
@@ -824,57 +1029,75 @@ class ProgressNote(BaseModel):
     interventions_used: List[str] = field(default_factory=list)
     patient_response: str = ""
     
-    def validate(self) -> None:
-        """Validate progress note data"""
-        errors = []
-        
+    def validate(self, _all_errors: bool = False) -> None:
+        """Validate progress note data, stopping at the first error unless _all_errors"""
+        _raise_errors("Progress note", self._validation_errors(), _all_errors)
+    
+    def _validation_errors(self) -> Iterator[str]:
+        """Yield each validation error message in check order"""
         # Patient ID validation
         if self.patient_id <= 0:
-            errors.append("Patient ID must be a positive integer")
+            yield "Patient ID must be a positive integer"
         
         # Note type validation
-        valid_note_types = ["SOAP", "progress", "crisis", "assessment", "treatment_plan", "discharge"]
-        if self.note_type not in valid_note_types:
-            errors.append(f"Note type must be one of: {', '.join(valid_note_types)}")
+        if self.note_type not in _VALID_NOTE_TYPES:
+            yield _ERR_NOTE_TYPE
         
         # SOAP components validation (if SOAP note)
         if self.note_type == "SOAP":
-            if not self.subjective or len(self.subjective.strip()) < 10:
-                errors.append("Subjective section must be at least 10 characters for SOAP notes")
+            if not self.subjective or not _stripped_len_at_least(self.subjective, 10):
+                yield "Subjective section must be at least 10 characters for SOAP notes"
             
-            if not self.objective or len(self.objective.strip()) < 10:
-                errors.append("Objective section must be at least 10 characters for SOAP notes")
+            if not self.objective or not _stripped_len_at_least(self.objective, 10):
+                yield "Objective section must be at least 10 characters for SOAP notes"
             
-            if not self.assessment or len(self.assessment.strip()) < 10:
-                errors.append("Assessment section must be at least 10 characters for SOAP notes")
+            if not self.assessment or not _stripped_len_at_least(self.assessment, 10):
+                yield "Assessment section must be at least 10 characters for SOAP notes"
             
-            if not self.plan or len(self.plan.strip()) < 10:
-                errors.append("Plan section must be at least 10 characters for SOAP notes")
-        
-        if errors:
-            raise ValidationError(f"Progress note validation errors: {'; '.join(errors)}")
-    
+            if not self.plan or not _stripped_len_at_least(self.plan, 10):
+                yield "Plan section must be at least 10 characters for SOAP notes"
+
     def get_word_count(self) -> Dict[str, int]:
         """Get word count for each section"""
+        subjective = len(self.subjective.split())
+        objective = len(self.objective.split())
+        assessment = len(self.assessment.split())
+        plan = len(self.plan.split())
+        # Sections are joined by whitespace, so the total is just the sum
         return {
-            'subjective': len(self.subjective.split()),
-            'objective': len(self.objective.split()),
-            'assessment': len(self.assessment.split()),
-            'plan': len(self.plan.split()),
-            'total': len((self.subjective + ' ' + self.objective + ' ' + self.assessment + ' ' + self.plan).split())
+            'subjective': subjective,
+            'objective': objective,
+            'assessment': assessment,
+            'plan': plan,
+            'total': subjective + objective + assessment + plan
         }
     
     def sign_note(self, signed_by: str = None) -> None:
         """Sign the progress note"""
         self.signed = True
-        self.last_modified = datetime.now().isoformat()
+        self.last_modified = _now().isoformat()
         if signed_by:
             self.created_by = signed_by
         self.update_timestamp()
 
 
+# Calendar weeks per planned treatment week for each session frequency
+_FREQ_MULT = {"weekly": 1, "biweekly": 2, "monthly": 4, "as_needed": 1}
+
+
+@functools.lru_cache(maxsize=4096)
+def _compute_completion(created_date: str, session_frequency: str, duration_weeks: int) -> str:
+    """Expected completion date for a plan; "" if created_date is not ISO format"""
+    try:
+        start_date = _fromiso(created_date)
+        mult = _FREQ_MULT.get(session_frequency, 1)  # unknown frequencies count as weekly
+        return (start_date + _td(weeks=duration_weeks * mult)).isoformat()
+    except ValueError:
+        return ""
+
+
 # Treatment Plan Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TreatmentPlan(BaseModel):
     """Treatment plan data model"""
     
@@ -907,75 +1130,64 @@ class TreatmentPlan(BaseModel):
     baseline_assessments: Dict[str, int] = field(default_factory=dict)
     progress_markers: List[str] = field(default_factory=list)
     
-    def validate(self) -> None:
-        """Validate treatment plan data"""
-        errors = []
-        
+    def validate(self, _all_errors: bool = False) -> None:
+        """Validate treatment plan data, stopping at the first error unless _all_errors"""
+        _raise_errors("Treatment plan", self._validation_errors(), _all_errors)
+    
+    def _validation_errors(self) -> Iterator[str]:
+        """Yield each validation error message in check order"""
         # Patient ID validation
         if self.patient_id <= 0:
-            errors.append("Patient ID must be a positive integer")
+            yield "Patient ID must be a positive integer"
         
         # Plan name validation
         if not self.plan_name or len(self.plan_name.strip()) < 3:
-            errors.append("Plan name must be at least 3 characters long")
+            yield "Plan name must be at least 3 characters long"
         
         # Modality validation
-        valid_modalities = [m.value for m in TherapyModality]
-        if self.primary_modality not in valid_modalities:
-            errors.append(f"Primary modality must be one of: {', '.join(valid_modalities)}")
+        if self.primary_modality not in _VALID_MODALITIES:
+            yield _ERR_PRIMARY_MODALITY
         
         # Duration validation
         if not (1 <= self.estimated_duration_weeks <= 104):  # 2 years max
-            errors.append("Estimated duration must be between 1 and 104 weeks")
+            yield "Estimated duration must be between 1 and 104 weeks"
         
         if not (1 <= self.total_sessions_planned <= 200):
-            errors.append("Total sessions planned must be between 1 and 200")
+            yield "Total sessions planned must be between 1 and 200"
         
         # Status validation
-        valid_statuses = ["active", "completed", "modified", "on_hold", "discontinued"]
-        if self.status not in valid_statuses:
-            errors.append(f"Status must be one of: {', '.join(valid_statuses)}")
+        if self.status not in _VALID_PLAN_STATUSES:
+            yield _ERR_PLAN_STATUS
         
         # Session frequency validation
-        valid_frequencies = ["weekly", "biweekly", "monthly", "as_needed"]
-        if self.session_frequency not in valid_frequencies:
-            errors.append(f"Session frequency must be one of: {', '.join(valid_frequencies)}")
-        
-        if errors:
-            raise ValidationError(f"Treatment plan validation errors: {'; '.join(errors)}")
-    
+        if self.session_frequency not in _VALID_FREQUENCIES:
+            yield _ERR_FREQUENCY
+
     def calculate_expected_completion_date(self) -> str:
         """Calculate expected completion date based on duration and frequency"""
-        try:
-            start_date = datetime.fromisoformat(self.created_date)
-            
-            if self.session_frequency == "weekly":
-                completion_date = start_date + timedelta(weeks=self.estimated_duration_weeks)
-            elif self.session_frequency == "biweekly":
-                completion_date = start_date + timedelta(weeks=self.estimated_duration_weeks * 2)
-            elif self.session_frequency == "monthly":
-                completion_date = start_date + timedelta(weeks=self.estimated_duration_weeks * 4)
-            else:  # as_needed
-                completion_date = start_date + timedelta(weeks=self.estimated_duration_weeks)
-            
-            return completion_date.isoformat()
-        except ValueError:
-            return ""
+        return _compute_completion(self.created_date, self.session_frequency, self.estimated_duration_weeks)
     
-    def is_due_for_review(self) -> bool:
-        """Check if treatment plan is due for review"""
+    def is_due_for_review(self, now_iso: Optional[str] = None) -> bool:
+        """Check if treatment plan is due for review (pass now_iso to share one clock read across a batch)"""
         if not self.next_review_date:
             return True  # No review date set, so it's overdue
         
+        if now_iso is None:
+            now_iso = _now().isoformat()
+        
+        # Canonical local ISO strings sort like datetimes, so skip parsing them
+        if _is_sortable_iso(self.next_review_date):
+            return now_iso >= self.next_review_date
+        
         try:
-            review_date = datetime.fromisoformat(self.next_review_date)
-            return datetime.now() >= review_date
+            review_date = _fromiso(self.next_review_date)
+            return _fromiso(now_iso) >= review_date
         except ValueError:
             return True
 
 
 # Crisis Plan Model
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CrisisPlan(BaseModel):
     """Crisis intervention plan data model"""
     
@@ -1003,32 +1215,31 @@ class CrisisPlan(BaseModel):
     last_reviewed: Optional[str] = None
     next_review_date: Optional[str] = None
     
-    def validate(self) -> None:
-        """Validate crisis plan data"""
-        errors = []
-        
+    def validate(self, _all_errors: bool = False) -> None:
+        """Validate crisis plan data, stopping at the first error unless _all_errors"""
+        _raise_errors("Crisis plan", self._validation_errors(), _all_errors)
+    
+    def _validation_errors(self) -> Iterator[str]:
+        """Yield each validation error message in check order"""
         # Patient ID validation
         if self.patient_id <= 0:
-            errors.append("Patient ID must be a positive integer")
+            yield "Patient ID must be a positive integer"
         
         # Ensure essential components are present
         if not self.warning_signs:
-            errors.append("Warning signs must be specified")
+            yield "Warning signs must be specified"
         
         if not self.internal_coping_strategies:
-            errors.append("At least one internal coping strategy must be specified")
+            yield "At least one internal coping strategy must be specified"
         
         if not self.professional_contacts:
-            errors.append("At least one professional contact must be specified")
+            yield "At least one professional contact must be specified"
         
         # Validate contact information structure
-        for contact in self.external_supports + self.professional_contacts:
+        for contact in chain(self.external_supports, self.professional_contacts):
             if not isinstance(contact, dict) or 'name' not in contact or 'phone' not in contact:
-                errors.append("Contacts must include name and phone number")
-        
-        if errors:
-            raise ValidationError(f"Crisis plan validation errors: {'; '.join(errors)}")
-    
+                yield "Contacts must include name and phone number"
+
     def add_support_contact(self, name: str, phone: str, relationship: str = "") -> None:
         """Add a support contact"""
         contact = {
@@ -1091,13 +1302,60 @@ class ModelFactory:
             raise ValueError(f"Unknown model type: {model_type}")
         
         model_class = cls.model_classes[model_type]
-        return list(model_class.__dataclass_fields__.keys())
+        return list(_field_names(model_class))  # fresh list; the cached tuple is shared
+
+
+# Column order expected by screen_session_rows; batch loaders can screen raw
+# rows first and only build Session objects for rows that can pass validation
+SESSION_NUMERIC_FIELDS = (
+    'patient_id', 'duration',
+    'mood_before', 'mood_after', 'energy_before', 'energy_after',
+    'anxiety_before', 'anxiety_after', 'therapeutic_alliance_rating', 'session_satisfaction'
+)
+
+
+def screen_session_rows(rows: Iterable[Sequence[Optional[int]]]) -> List[bool]:
+    """Check Session's numeric bounds over raw rows without building objects"""
+    return [
+        patient_id > 0 and 0 < duration <= 300
+        and all(rating is None or 1 <= rating <= 10 for rating in ratings)
+        for patient_id, duration, *ratings in rows
+    ]
+
+
+def batch_severity(types: Sequence[str], scores: Sequence[int]) -> List[str]:
+    """Assessment.calculate_severity_level over parallel type/score columns"""
+    return list(map(_severity_label, types, scores))
+
+
+def batch_clinical_significance(types: Sequence[str], scores: Sequence[int]) -> List[bool]:
+    """Assessment.is_clinically_significant over parallel type/score columns"""
+    return list(map(_is_significant, types, scores))
+
+
+def word_counts_batch(texts: Iterable[str]) -> List[int]:
+    """Whitespace-delimited word count of each text, e.g. one SOAP section column"""
+    return [len(text.split()) for text in texts]
+
+
+# Minimal constructor arguments per model type used by validate_all_models
+_MIN_KWARGS = {
+    'patient': {'name': "Test Patient"},
+    'session': {'patient_id': 1},
+    'assessment': {'patient_id': 1},
+    'diagnosis': {'patient_id': 1},
+    'treatment_goal': {'patient_id': 1},
+    'homework_assignment': {'patient_id': 1},
+    'progress_note': {'patient_id': 1},
+    'treatment_plan': {'patient_id': 1},
+    'crisis_plan': {'patient_id': 1}
+}
 
 
 def validate_all_models() -> Dict[str, Any]:
     """Validate all model classes and return validation report"""
     validation_report = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': _now().isoformat(),
         'models_tested': 0,
         'validation_errors': {},
         'all_valid': True
@@ -1108,13 +1366,7 @@ def validate_all_models() -> Dict[str, Any]:
         
         try:
             # Create instance with minimal valid data
-            if model_name == 'patient':
-                test_instance = model_class(name="Test Patient")
-            elif model_name in ['session', 'assessment', 'diagnosis', 'treatment_goal', 
-                               'homework_assignment', 'progress_note', 'treatment_plan', 'crisis_plan']:
-                test_instance = model_class(patient_id=1)
-            else:
-                test_instance = model_class()
+            test_instance = model_class(**_MIN_KWARGS.get(model_name, {}))
             
             # Validation passed if no exception raised
             validation_report[f'{model_name}_valid'] = True
@@ -1134,6 +1386,19 @@ def validate_all_models() -> Dict[str, Any]:
 
 def create_sample_data() -> Dict[str, BaseModel]:
     """Create sample instances of all models for testing"""
+    # Deep copies of cached templates, so callers may mutate their samples freely
+    return {name: copy.deepcopy(instance) for name, instance in _sample_templates().items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _sample_templates() -> Dict[str, BaseModel]:
+    """Build the sample templates once; a build that raises is retried on the next call"""
+    with frozen_now():
+        return _build_samples()
+
+
+def _build_samples() -> Dict[str, BaseModel]:
+    """Build one sample instance of each model"""
     samples = {}
     
     # Sample Patient
@@ -1194,7 +1459,7 @@ def create_sample_data() -> Dict[str, BaseModel]:
         assignment_type="thought_record",
         description="Daily thought record practice",
         instructions="Complete thought record when experiencing negative emotions",
-        due_date=(datetime.now() + timedelta(days=7)).isoformat(),
+        due_date=(_now() + _td(days=7)).isoformat(),
         estimated_time_minutes=20
     )
     
@@ -1229,8 +1494,8 @@ def create_sample_data() -> Dict[str, BaseModel]:
     return samples
 
 
-def export_model_schemas() -> Dict[str, Dict[str, Any]]:
-    """Export schema information for all models"""
+def _build_model_schemas() -> Dict[str, Dict[str, Any]]:
+    """Reflect schema information for all models"""
     schemas = {}
     
     for model_name, model_class in ModelFactory.model_classes.items():
@@ -1241,13 +1506,20 @@ def export_model_schemas() -> Dict[str, Dict[str, Any]]:
         }
         
         for field_name, field_info in model_class.__dataclass_fields__.items():
-            field_type = str(field_info.type)
-            field_default = field_info.default if field_info.default != field_info.default_factory else "factory"
+            has_default = field_info.default is not MISSING
+            has_factory = field_info.default_factory is not MISSING
+            
+            if has_default:
+                field_default = str(field_info.default)
+            elif has_factory:
+                field_default = "factory"
+            else:
+                field_default = None
             
             schema['fields'][field_name] = {
-                'type': field_type,
-                'default': str(field_default),
-                'required': field_info.default == field_info.default_factory and field_default == "factory"
+                'type': str(field_info.type),
+                'default': field_default,
+                'required': not (has_default or has_factory)
             }
         
         schema['field_count'] = len(schema['fields'])
@@ -1256,6 +1528,16 @@ def export_model_schemas() -> Dict[str, Dict[str, Any]]:
     return schemas
 
 
+# Model classes are fixed once the module is imported, so reflect them once
+_MODEL_SCHEMAS = _build_model_schemas()
+
+
+def export_model_schemas() -> Dict[str, Dict[str, Any]]:
+    """Export schema information for all models"""
+    # Built once at import; callers get their own copy so edits can't leak
+    return copy.deepcopy(_MODEL_SCHEMAS)
+
+
 # Test function
 def main():
     """Test all models and validation"""
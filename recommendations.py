@@ -7,15 +7,114 @@ This module analyzes therapy session conversations and generates two types of re
 """
 
 import asyncio
+import hashlib
 import json
-import re
-from typing import Dict, List, Any, Optional
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
 from datetime import datetime
 import google.generativeai as genai
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
+try:
+    import orjson
+except ImportError:
+    # Optional fast JSON codec; stdlib json is used when unavailable
+    orjson = None
 
-@dataclass
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Recommendations are immutable values; slotted where dataclasses support it (3.10+)
+_DATACLASS_OPTIONS = {'frozen': True, 'slots': True} if sys.version_info >= (3, 10) else {'frozen': True}
+
+# Ask Gemini for bare JSON instead of prose around a JSON block (JSON mode needs
+# google-generativeai 0.5.1+, the floor in requirements.txt)
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+
+def _extract_json(text: str, open_char: str, close_char: str) -> Optional[str]:
+    """Slice from the first open_char to the last close_char, like a greedy DOTALL regex but linear"""
+    start = text.find(open_char)
+    end = text.rfind(close_char)
+    if start == -1 or end < start:
+        return None
+    return text[start:end + 1]
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# keywords_data lists that the recommendation prompts render comma-separated
+_PROMPT_FRAGMENT_KEYS = (
+    'primary_symptoms', 'secondary_concerns', 'learning_needs',
+    'therapeutic_themes', 'behavioral_patterns', 'triggers'
+)
+
+
+def _prompt_fragments(keywords_data: Dict[str, Any]) -> Dict[str, str]:
+    """Render each keyword list once for reuse across the recommendation prompts"""
+    return {key: ', '.join(keywords_data.get(key, [])) for key in _PROMPT_FRAGMENT_KEYS}
+
+# (epoch second, ISO string) of the last generated_at stamp; batches finishing
+# within the same second share one formatted timestamp
+_LAST_TIMESTAMP = [0, ""]
+
+
+def _generated_at() -> str:
+    """Local ISO timestamp at one-second resolution, formatted at most once per second"""
+    now = int(time.time())
+    if now != _LAST_TIMESTAMP[0]:
+        _LAST_TIMESTAMP[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _LAST_TIMESTAMP[1]
+
+
+async def _stream_json_array(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yield each element of a streamed top-level JSON array as soon as it is complete"""
+    buffer = ""
+    pos = -1  # index just past '[' once the array has started
+    
+    async for text in chunks:
+        buffer += text
+        if pos < 0:
+            start = buffer.find('[')
+            if start == -1:
+                continue
+            pos = start + 1
+        
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element still incomplete, wait for the next chunk
+            yield item
+        
+        # Drop consumed text so the buffer only holds the element in progress
+        buffer = buffer[pos:]
+        pos = 0
+
+
+# Fallback keyword categories, checked as plain substrings of the lowered
+# transcript; str containment is a C-level search and measured far faster
+# than walking one alternation regex over the text
+_FALLBACK_SYMPTOMS = (
+    ('anxiety', ('anxious', 'worried', 'panic', 'fear', 'nervous')),
+    ('depression', ('depressed', 'sad', 'hopeless', 'empty', 'worthless'))
+)
+_FALLBACK_CONCERNS = (
+    ('sleep_issues', ('sleep', 'insomnia', 'tired', 'exhausted')),
+    ('work_stress', ('work', 'job', 'boss', 'career', 'stress'))
+)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ContentRecommendation:
     """Structure for content recommendations"""
     title: str
@@ -26,7 +125,7 @@ class ContentRecommendation:
     estimated_duration: str
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LifestyleRecommendation:
     """Structure for lifestyle recommendations"""
     title: str
@@ -40,24 +139,14 @@ class LifestyleRecommendation:
     relates_to_homework: Optional[str] = None
 
 
-class TherapyKeywordExtractor:
-    """Extract therapeutic keywords and themes from conversations"""
-    
-    def __init__(self, gemini_model):
-        self.model = gemini_model
-    
-    async def extract_keywords_and_themes(self, conversation_history: List[Dict]) -> Dict[str, Any]:
-        """Extract keywords, themes, and therapeutic insights from conversation"""
-        
-        # Build conversation text
-        conversation_text = self._format_conversation(conversation_history)
-        
-        extraction_prompt = f"""
+# Static text of the keyword extraction prompt around the conversation
+_EXTRACTION_PROMPT_HEAD = """
 Analyze this therapy session conversation and extract key information for generating recommendations:
 
 CONVERSATION:
-{conversation_text}
+"""
 
+_EXTRACTION_PROMPT_TAIL = """
 Extract and provide:
 1. PRIMARY SYMPTOMS: Main mental health symptoms discussed (anxiety, depression, trauma, etc.)
 2. SECONDARY CONCERNS: Related issues (sleep, relationships, work, etc.)  
@@ -71,7 +160,7 @@ Extract and provide:
 10. MOTIVATION LEVEL: Patient's readiness for change and engagement
 
 Format your response as JSON:
-{{
+{
     "primary_symptoms": ["symptom1", "symptom2"],
     "secondary_concerns": ["concern1", "concern2"],
     "therapeutic_themes": ["theme1", "theme2"],
@@ -83,18 +172,55 @@ Format your response as JSON:
     "triggers": ["trigger1", "trigger2"],
     "motivation_level": "high/medium/low",
     "session_summary": "2-3 sentence summary of key session themes"
-}}
+}
 """
+
+
+class TherapyKeywordExtractor:
+    """Extract therapeutic keywords and themes from conversations"""
+    
+    CACHE_SIZE = 256
+    
+    # Themes come from recent exchanges; older ones belong in a rolling summary
+    # rather than in every prompt, which keeps input tokens bounded
+    MAX_EXCHANGES = 20
+    MAX_CHARS_PER_EXCHANGE = 500
+    
+    def __init__(self, gemini_model):
+        self.model = gemini_model
+        # Conversation digest -> extracted JSON text, least recently used first
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+    
+    async def extract_keywords_and_themes(
+        self,
+        conversation_history: List[Dict],
+        use_cache: bool = True,
+        rolling_summary: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Extract keywords, themes, and therapeutic insights from conversation"""
+        
+        # Build conversation text
+        conversation_text = self._format_conversation(conversation_history, rolling_summary)
+        
+        # An unchanged conversation yields the same analysis, so skip the round-trip
+        cache_key = hashlib.blake2b(conversation_text.encode('utf-8'), digest_size=16).hexdigest()
+        if use_cache and cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return _json_loads(self._cache[cache_key])  # fresh objects for every caller
+        
+        extraction_prompt = f"{_EXTRACTION_PROMPT_HEAD}{conversation_text}\n{_EXTRACTION_PROMPT_TAIL}"
         
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.model.generate_content(extraction_prompt)
+            response = await self.model.generate_content_async(
+                extraction_prompt, generation_config=_JSON_GENERATION_CONFIG
             )
             
             # Parse JSON response
-            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+            json_text = _extract_json(response.text, '{', '}')
+            if json_text:
+                keywords_data = _json_loads(json_text)
+                self._remember(cache_key, json_text)
+                return keywords_data
             else:
                 # Fallback parsing if JSON isn't cleanly formatted
                 return self._fallback_keyword_extraction(conversation_text)
@@ -103,36 +229,39 @@ Format your response as JSON:
             print(f"Keyword extraction error: {e}")
             return self._fallback_keyword_extraction(conversation_text)
     
-    def _format_conversation(self, conversation_history: List[Dict]) -> str:
-        """Format conversation for analysis"""
-        formatted = []
-        for exchange in conversation_history:
-            formatted.append(f"Patient: {exchange.get('user', '')}")
-            formatted.append(f"Therapist: {exchange.get('ai', '')}")
-        return "\n".join(formatted)
+    def _remember(self, cache_key: str, json_text: str) -> None:
+        """Cache a successful extraction, evicting the least recently used entry"""
+        self._cache[cache_key] = json_text
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def _format_conversation(self, conversation_history: List[Dict], rolling_summary: Optional[str] = None) -> str:
+        """Format the most recent exchanges for analysis, each side capped in length"""
+        limit = self.MAX_CHARS_PER_EXCHANGE
+        conversation_text = "\n".join(
+            f"Patient: {str(exchange.get('user', ''))[:limit]}\nTherapist: {str(exchange.get('ai', ''))[:limit]}"
+            for exchange in conversation_history[-self.MAX_EXCHANGES:]
+        )
+        if rolling_summary:
+            conversation_text = f"Summary of earlier exchanges: {rolling_summary}\n{conversation_text}"
+        return conversation_text
     
     def _fallback_keyword_extraction(self, conversation_text: str) -> Dict[str, Any]:
         """Fallback keyword extraction using simple pattern matching"""
         # Simple keyword detection for common therapy themes
-        anxiety_indicators = ['anxious', 'worried', 'panic', 'fear', 'nervous']
-        depression_indicators = ['depressed', 'sad', 'hopeless', 'empty', 'worthless']
-        sleep_indicators = ['sleep', 'insomnia', 'tired', 'exhausted']
-        work_indicators = ['work', 'job', 'boss', 'career', 'stress']
-        
         text_lower = conversation_text.lower()
         
-        primary_symptoms = []
-        if any(word in text_lower for word in anxiety_indicators):
-            primary_symptoms.append('anxiety')
-        if any(word in text_lower for word in depression_indicators):
-            primary_symptoms.append('depression')
-        
-        secondary_concerns = []
-        if any(word in text_lower for word in sleep_indicators):
-            secondary_concerns.append('sleep_issues')
-        if any(word in text_lower for word in work_indicators):
-            secondary_concerns.append('work_stress')
+        primary_symptoms = [
+            symptom for symptom, indicators in _FALLBACK_SYMPTOMS
+            if any(word in text_lower for word in indicators)
+        ]
         
+        secondary_concerns = [
+            concern for concern, indicators in _FALLBACK_CONCERNS
+            if any(word in text_lower for word in indicators)
+        ]
+
         return {
             "primary_symptoms": primary_symptoms,
             "secondary_concerns": secondary_concerns,
@@ -148,29 +277,8 @@ Format your response as JSON:
         }
 
 
-class ContentRecommendationGenerator:
-    """Generate content recommendations based on session analysis"""
-    
-    def __init__(self, gemini_model):
-        self.model = gemini_model
-    
-    async def generate_content_recommendations(
-        self, 
-        keywords_data: Dict[str, Any], 
-        num_recommendations: int = 5
-    ) -> List[ContentRecommendation]:
-        """Generate content recommendations based on extracted keywords"""
-        
-        content_prompt = f"""
-Based on this therapy session analysis, recommend {num_recommendations} educational/therapeutic content pieces:
-
-SESSION ANALYSIS:
-- Primary Symptoms: {', '.join(keywords_data.get('primary_symptoms', []))}
-- Secondary Concerns: {', '.join(keywords_data.get('secondary_concerns', []))}
-- Learning Needs: {', '.join(keywords_data.get('learning_needs', []))}
-- Therapeutic Themes: {', '.join(keywords_data.get('therapeutic_themes', []))}
-- Session Summary: {keywords_data.get('session_summary', '')}
-
+# Static instructions and JSON shape that end the content recommendation prompt
+_CONTENT_PROMPT_TAIL = """
 Generate recommendations for:
 1. YouTube videos (educational, guided meditations, techniques)
 2. Articles or blog posts
@@ -188,28 +296,55 @@ For each recommendation, provide:
 
 Format as JSON array:
 [
-  {{
+  {
     "title": "specific title",
     "description": "why this helps the patient",
     "content_type": "youtube/article/podcast/app",
     "search_query": "exact search terms",
     "relevance_reason": "how it addresses their needs",
     "estimated_duration": "10 minutes/30 minutes/etc"
-  }}
+  }
 ]
 
 Focus on evidence-based, professional content. Avoid overly clinical or triggering material.
 """
+
+
+class ContentRecommendationGenerator:
+    """Generate content recommendations based on session analysis"""
+    
+    def __init__(self, gemini_model):
+        self.model = gemini_model
+    
+    async def generate_content_recommendations(
+        self, 
+        keywords_data: Dict[str, Any], 
+        num_recommendations: int = 5,
+        prompt_fragments: Optional[Dict[str, str]] = None
+    ) -> List[ContentRecommendation]:
+        """Generate content recommendations based on extracted keywords"""
+        
+        fragments = prompt_fragments or _prompt_fragments(keywords_data)
+        content_prompt = f"""
+Based on this therapy session analysis, recommend {num_recommendations} educational/therapeutic content pieces:
+
+SESSION ANALYSIS:
+- Primary Symptoms: {fragments['primary_symptoms']}
+- Secondary Concerns: {fragments['secondary_concerns']}
+- Learning Needs: {fragments['learning_needs']}
+- Therapeutic Themes: {fragments['therapeutic_themes']}
+- Session Summary: {keywords_data.get('session_summary', '')}
+""" + _CONTENT_PROMPT_TAIL
         
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.model.generate_content(content_prompt)
+            response = await self.model.generate_content_async(
+                content_prompt, generation_config=_JSON_GENERATION_CONFIG
             )
             
             # Parse JSON response
-            json_match = re.search(r'\[.*\]', response.text, re.DOTALL)
-            if json_match:
-                recommendations_data = json.loads(json_match.group())
+            json_text = _extract_json(response.text, '[', ']')
+            if json_text:
+                recommendations_data = _json_loads(json_text)
                 return [ContentRecommendation(**rec) for rec in recommendations_data]
             else:
                 return self._fallback_content_recommendations(keywords_data)
@@ -246,40 +381,8 @@ Focus on evidence-based, professional content. Avoid overly clinical or triggeri
         return recommendations
 
 
-class LifestyleRecommendationGenerator:
-    """Generate lifestyle recommendations based on goals and homework"""
-    
-    def __init__(self, gemini_model):
-        self.model = gemini_model
-    
-    async def generate_lifestyle_recommendations(
-        self,
-        keywords_data: Dict[str, Any],
-        goals: List[Dict[str, Any]],
-        homework: List[Dict[str, Any]],
-        num_recommendations: int = 6
-    ) -> List[LifestyleRecommendation]:
-        """Generate lifestyle recommendations based on session analysis and treatment plan"""
-        
-        goals_text = self._format_goals(goals)
-        homework_text = self._format_homework(homework)
-        
-        lifestyle_prompt = f"""
-Based on this therapy session analysis and treatment plan, recommend {num_recommendations} lifestyle activities:
-
-SESSION ANALYSIS:
-- Primary Symptoms: {', '.join(keywords_data.get('primary_symptoms', []))}
-- Behavioral Patterns: {', '.join(keywords_data.get('behavioral_patterns', []))}
-- Triggers: {', '.join(keywords_data.get('triggers', []))}
-- Motivation Level: {keywords_data.get('motivation_level', 'medium')}
-
-TREATMENT GOALS:
-{goals_text}
-
-HOMEWORK ASSIGNMENTS:
-{homework_text}
-
-Generate {num_recommendations} lifestyle recommendations that:
+# Static instructions and JSON shape that end the lifestyle recommendation prompt
+_LIFESTYLE_PROMPT_TAIL = """
 1. Support the patient's treatment goals
 2. Complement their homework assignments
 3. Address their specific symptoms and triggers
@@ -305,7 +408,7 @@ For each recommendation provide:
 
 Format as JSON array:
 [
-  {{
+  {
     "title": "specific activity title",
     "description": "what this activity involves",
     "activity_type": "physical/mental/social/self_care",
@@ -315,21 +418,42 @@ Format as JSON array:
     "difficulty_level": "beginner/intermediate/advanced",
     "relates_to_goal": "goal description if applicable",
     "relates_to_homework": "homework type if applicable"
-  }}
+  }
 ]
 
 Focus on evidence-based wellness activities. Consider the patient's current capacity and symptoms.
 """
+
+
+class LifestyleRecommendationGenerator:
+    """Generate lifestyle recommendations based on goals and homework"""
+    
+    def __init__(self, gemini_model):
+        self.model = gemini_model
+    
+    async def generate_lifestyle_recommendations(
+        self,
+        keywords_data: Dict[str, Any],
+        goals: List[Dict[str, Any]],
+        homework: List[Dict[str, Any]],
+        num_recommendations: int = 6,
+        prompt_fragments: Optional[Dict[str, str]] = None
+    ) -> List[LifestyleRecommendation]:
+        """Generate lifestyle recommendations based on session analysis and treatment plan"""
+        
+        lifestyle_prompt = self._lifestyle_prompt(
+            keywords_data, goals, homework, num_recommendations, prompt_fragments
+        )
         
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.model.generate_content(lifestyle_prompt)
+            response = await self.model.generate_content_async(
+                lifestyle_prompt, generation_config=_JSON_GENERATION_CONFIG
             )
             
             # Parse JSON response
-            json_match = re.search(r'\[.*\]', response.text, re.DOTALL)
-            if json_match:
-                recommendations_data = json.loads(json_match.group())
+            json_text = _extract_json(response.text, '[', ']')
+            if json_text:
+                recommendations_data = _json_loads(json_text)
                 return [LifestyleRecommendation(**rec) for rec in recommendations_data]
             else:
                 return self._fallback_lifestyle_recommendations(keywords_data, goals, homework)
@@ -338,25 +462,84 @@ Focus on evidence-based wellness activities. Consider the patient's current capa
             print(f"Lifestyle recommendation error: {e}")
             return self._fallback_lifestyle_recommendations(keywords_data, goals, homework)
     
+    async def stream_lifestyle_recommendations(
+        self,
+        keywords_data: Dict[str, Any],
+        goals: List[Dict[str, Any]],
+        homework: List[Dict[str, Any]],
+        num_recommendations: int = 6,
+        prompt_fragments: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[LifestyleRecommendation]:
+        """Yield lifestyle recommendations one by one as Gemini streams them"""
+        
+        lifestyle_prompt = self._lifestyle_prompt(
+            keywords_data, goals, homework, num_recommendations, prompt_fragments
+        )
+        yielded = False
+        
+        try:
+            response = await self.model.generate_content_async(
+                lifestyle_prompt, generation_config=_JSON_GENERATION_CONFIG, stream=True
+            )
+            
+            async for rec in _stream_json_array(chunk.text async for chunk in response):
+                yield LifestyleRecommendation(**rec)
+                yielded = True
+                
+        except Exception as e:
+            print(f"Lifestyle recommendation error: {e}")
+        
+        if not yielded:
+            for rec in self._fallback_lifestyle_recommendations(keywords_data, goals, homework):
+                yield rec
+    
+    def _lifestyle_prompt(
+        self,
+        keywords_data: Dict[str, Any],
+        goals: List[Dict[str, Any]],
+        homework: List[Dict[str, Any]],
+        num_recommendations: int,
+        prompt_fragments: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Build the lifestyle recommendation prompt"""
+        fragments = prompt_fragments or _prompt_fragments(keywords_data)
+        goals_text = self._format_goals(goals)
+        homework_text = self._format_homework(homework)
+        
+        return f"""
+Based on this therapy session analysis and treatment plan, recommend {num_recommendations} lifestyle activities:
+
+SESSION ANALYSIS:
+- Primary Symptoms: {fragments['primary_symptoms']}
+- Behavioral Patterns: {fragments['behavioral_patterns']}
+- Triggers: {fragments['triggers']}
+- Motivation Level: {keywords_data.get('motivation_level', 'medium')}
+
+TREATMENT GOALS:
+{goals_text}
+
+HOMEWORK ASSIGNMENTS:
+{homework_text}
+
+Generate {num_recommendations} lifestyle recommendations that:""" + _LIFESTYLE_PROMPT_TAIL
+    
     def _format_goals(self, goals: List[Dict[str, Any]]) -> str:
         """Format goals for prompt"""
         if not goals:
             return "No specific goals set yet."
         
-        formatted = []
-        for goal in goals:
-            formatted.append(f"- {goal.get('goal_type', '')}: {goal.get('goal_description', '')}")
-        return "\n".join(formatted)
+        return "\n".join(
+            f"- {goal.get('goal_type', '')}: {goal.get('goal_description', '')}" for goal in goals
+        )
     
     def _format_homework(self, homework: List[Dict[str, Any]]) -> str:
         """Format homework for prompt"""
         if not homework:
             return "No homework assignments yet."
         
-        formatted = []
-        for hw in homework:
-            formatted.append(f"- {hw.get('assignment_type', '')}: {hw.get('description', '')}")
-        return "\n".join(formatted)
+        return "\n".join(
+            f"- {hw.get('assignment_type', '')}: {hw.get('description', '')}" for hw in homework
+        )
     
     def _fallback_lifestyle_recommendations(
         self, 
@@ -397,10 +580,65 @@ Focus on evidence-based wellness activities. Consider the patient's current capa
         return recommendations
 
 
+# Static instructions and JSON shape that end the single-request prompt
+_FUSED_PROMPT_TAIL = """
+1. SESSION ANALYSIS: primary symptoms, secondary concerns, therapeutic themes, coping challenges,
+   strengths, learning needs, emotional state, behavioral patterns, triggers, motivation level
+   and a 2-3 sentence session summary.
+2. CONTENT RECOMMENDATIONS: YouTube videos, articles, podcasts, mobile apps or online resources that
+   address the patient's symptoms and learning needs. Focus on evidence-based, professional content.
+   Avoid overly clinical or triggering material.
+3. LIFESTYLE RECOMMENDATIONS: a mix of physical, mental, social and self-care activities that support
+   the treatment goals, complement the homework, address symptoms and triggers, match the
+   motivation level and are practical and achievable.
+
+Respond with a single JSON object:
+{
+    "session_analysis": {
+        "primary_symptoms": ["symptom1", "symptom2"],
+        "secondary_concerns": ["concern1", "concern2"],
+        "therapeutic_themes": ["theme1", "theme2"],
+        "coping_challenges": ["challenge1", "challenge2"],
+        "strengths": ["strength1", "strength2"],
+        "learning_needs": ["need1", "need2"],
+        "emotional_state": "description",
+        "behavioral_patterns": ["pattern1", "pattern2"],
+        "triggers": ["trigger1", "trigger2"],
+        "motivation_level": "high/medium/low",
+        "session_summary": "2-3 sentence summary of key session themes"
+    },
+    "content_recommendations": [
+        {
+            "title": "specific title",
+            "description": "why this helps the patient",
+            "content_type": "youtube/article/podcast/app",
+            "search_query": "exact search terms",
+            "relevance_reason": "how it addresses their needs",
+            "estimated_duration": "10 minutes/30 minutes/etc"
+        }
+    ],
+    "lifestyle_recommendations": [
+        {
+            "title": "specific activity title",
+            "description": "what this activity involves",
+            "activity_type": "physical/mental/social/self_care",
+            "instructions": "step-by-step instructions",
+            "frequency": "daily/3x week/weekly/etc",
+            "duration": "10 minutes/30 minutes/etc",
+            "difficulty_level": "beginner/intermediate/advanced",
+            "relates_to_goal": "goal description if applicable",
+            "relates_to_homework": "homework type if applicable"
+        }
+    ]
+}
+"""
+
+
 class RecommendationEngine:
     """Main recommendation engine that coordinates all components"""
     
     def __init__(self, gemini_model):
+        self.model = gemini_model
         self.keyword_extractor = TherapyKeywordExtractor(gemini_model)
         self.content_generator = ContentRecommendationGenerator(gemini_model)
         self.lifestyle_generator = LifestyleRecommendationGenerator(gemini_model)
@@ -411,7 +649,10 @@ class RecommendationEngine:
         goals: List[Dict[str, Any]] = None,
         homework: List[Dict[str, Any]] = None,
         content_count: int = 5,
-        lifestyle_count: int = 6
+        lifestyle_count: int = 6,
+        fused: bool = False,
+        use_cache: bool = True,
+        rolling_summary: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate complete recommendations for a therapy session
@@ -422,56 +663,149 @@ class RecommendationEngine:
             homework: Patient's homework assignments
             content_count: Number of content recommendations
             lifestyle_count: Number of lifestyle recommendations
-            
+            fused: Ask Gemini for analysis and both recommendation lists in a
+                single request, falling back to the three-call path on failure
+            use_cache: Reuse the keyword analysis of an identical conversation
+            rolling_summary: Summary of exchanges older than the analyzed window
+
         Returns:
             Dictionary containing all recommendations and analysis
         """
         
-        # Extract keywords and themes
-        keywords_data = await self.keyword_extractor.extract_keywords_and_themes(conversation_history)
+        goals = goals or []
+        homework = homework or []
         
-        # Generate content recommendations
-        content_recommendations = await self.content_generator.generate_content_recommendations(
-            keywords_data, content_count
-        )
+        fused_result = None
+        if fused:
+            fused_result = await self._generate_fused(
+                conversation_history, goals, homework, content_count, lifestyle_count, rolling_summary
+            )
         
-        # Generate lifestyle recommendations
-        lifestyle_recommendations = await self.lifestyle_generator.generate_lifestyle_recommendations(
-            keywords_data, goals or [], homework or [], lifestyle_count
-        )
+        if fused_result is not None:
+            keywords_data, content_recommendations, lifestyle_recommendations = fused_result
+        else:
+            # Extract keywords and themes
+            keywords_data = await self.keyword_extractor.extract_keywords_and_themes(
+                conversation_history, use_cache=use_cache, rolling_summary=rolling_summary
+            )
+            
+            # Content and lifestyle recommendations only depend on keywords_data,
+            # so both Gemini requests run concurrently, sharing the rendered lists
+            prompt_fragments = _prompt_fragments(keywords_data)
+            content_recommendations, lifestyle_recommendations = await asyncio.gather(
+                self.content_generator.generate_content_recommendations(
+                    keywords_data, content_count, prompt_fragments
+                ),
+                self.lifestyle_generator.generate_lifestyle_recommendations(
+                    keywords_data, goals, homework, lifestyle_count, prompt_fragments
+                ),
+                return_exceptions=True
+            )
+            
+            # One failed generator falls back on its own instead of failing both
+            if isinstance(content_recommendations, Exception):
+                print(f"Content recommendation error: {content_recommendations}")
+                content_recommendations = self.content_generator._fallback_content_recommendations(keywords_data)
+            
+            if isinstance(lifestyle_recommendations, Exception):
+                print(f"Lifestyle recommendation error: {lifestyle_recommendations}")
+                lifestyle_recommendations = self.lifestyle_generator._fallback_lifestyle_recommendations(
+                    keywords_data, goals, homework
+                )
         
         return {
             "session_analysis": keywords_data,
-            "content_recommendations": [
-                {
-                    "title": rec.title,
-                    "description": rec.description,
-                    "content_type": rec.content_type,
-                    "search_query": rec.search_query,
-                    "relevance_reason": rec.relevance_reason,
-                    "estimated_duration": rec.estimated_duration
-                } for rec in content_recommendations
-            ],
-            "lifestyle_recommendations": [
-                {
-                    "title": rec.title,
-                    "description": rec.description,
-                    "activity_type": rec.activity_type,
-                    "instructions": rec.instructions,
-                    "frequency": rec.frequency,
-                    "duration": rec.duration,
-                    "difficulty_level": rec.difficulty_level,
-                    "relates_to_goal": rec.relates_to_goal,
-                    "relates_to_homework": rec.relates_to_homework
-                } for rec in lifestyle_recommendations
-            ],
+            "content_recommendations": [asdict(rec) for rec in content_recommendations],
+            "lifestyle_recommendations": [asdict(rec) for rec in lifestyle_recommendations],
             "recommendation_metadata": {
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": _generated_at(),
                 "session_themes": keywords_data.get('therapeutic_themes', []),
                 "primary_focus": keywords_data.get('primary_symptoms', []),
                 "motivation_level": keywords_data.get('motivation_level', 'medium')
             }
         }
+    
+    async def generate_recommendations_batch(
+        self,
+        sessions: List[Dict[str, Any]],
+        max_concurrency: int = 32
+    ) -> List[Any]:
+        """
+        Generate recommendations for many sessions concurrently
+        
+        Args:
+            sessions: Keyword arguments for generate_recommendations, one dict per session
+            max_concurrency: Maximum number of sessions in flight at once
+            
+        Returns:
+            One result per session, in order; a session that failed yields its exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_one(session: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.generate_recommendations(**session)
+        
+        return await asyncio.gather(*(generate_one(session) for session in sessions), return_exceptions=True)
+    
+    async def _generate_fused(
+        self,
+        conversation_history: List[Dict[str, Any]],
+        goals: List[Dict[str, Any]],
+        homework: List[Dict[str, Any]],
+        content_count: int,
+        lifestyle_count: int,
+        rolling_summary: Optional[str] = None
+    ) -> Optional[Tuple[Dict[str, Any], List[ContentRecommendation], List[LifestyleRecommendation]]]:
+        """Run analysis and both recommendation lists as one Gemini request; None on failure"""
+        prompt = self._one_shot_prompt(
+            conversation_history, goals, homework, content_count, lifestyle_count, rolling_summary
+        )
+        
+        try:
+            response = await self.model.generate_content_async(
+                prompt, generation_config=_JSON_GENERATION_CONFIG
+            )
+            
+            # JSON mode returns the object itself, so no regex extraction is needed
+            data = _json_loads(response.text)
+            return (
+                data['session_analysis'],
+                [ContentRecommendation(**rec) for rec in data['content_recommendations']],
+                [LifestyleRecommendation(**rec) for rec in data['lifestyle_recommendations']]
+            )
+            
+        except Exception as e:
+            print(f"Fused recommendation error: {e}")
+            return None
+    
+    def _one_shot_prompt(
+        self,
+        conversation_history: List[Dict[str, Any]],
+        goals: List[Dict[str, Any]],
+        homework: List[Dict[str, Any]],
+        content_count: int,
+        lifestyle_count: int,
+        rolling_summary: Optional[str] = None
+    ) -> str:
+        """Single prompt covering keyword extraction, content and lifestyle recommendations"""
+        conversation_text = self.keyword_extractor._format_conversation(conversation_history, rolling_summary)
+        goals_text = self.lifestyle_generator._format_goals(goals)
+        homework_text = self.lifestyle_generator._format_homework(homework)
+        
+        return f"""
+Analyze this therapy session conversation, then use that analysis and the treatment plan to recommend
+{content_count} educational/therapeutic content pieces and {lifestyle_count} lifestyle activities.
+
+CONVERSATION:
+{conversation_text}
+
+TREATMENT GOALS:
+{goals_text}
+
+HOMEWORK ASSIGNMENTS:
+{homework_text}
+""" + _FUSED_PROMPT_TAIL
 
 
 # Usage example and testing function
@@ -526,6 +860,9 @@ if __name__ == "__main__":
     async def main():
         genai.configure(api_key="YOUR_GEMINI_API_KEY_HERE")
         recommendations = await test_recommendation_engine()
-        print(json.dumps(recommendations, indent=2))
+        if orjson is not None:
+            print(orjson.dumps(recommendations, option=orjson.OPT_INDENT_2).decode('utf-8'))
+        else:
+            print(json.dumps(recommendations, indent=2))
     
     asyncio.run(main())
\ No newline at end of file
@@ -10,13 +10,25 @@ import shutil
 import logging
 import hashlib
 import zipfile
+import functools
+import itertools
+import time
+import tempfile
+import queue
+import atexit
+import threading
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Any, Optional, Union, Tuple
 from pathlib import Path
 import sqlite3
-from cryptography.fernet import Fernet
 import base64
 
+try:
+    import orjson
+except ImportError:
+    # Optional fast JSON encoder; stdlib json is used when unavailable
+    orjson = None
+
 
 # =============================================================================
 # Logging and Monitoring Setup
@@ -42,15 +54,20 @@ def setup_logging(log_level: str = 'INFO', log_file: str = 'therapy_system.log')
         '%(asctime)s | %(levelname)s | %(message)s'
     )
     
-    # File handler with rotation
-    from logging.handlers import RotatingFileHandler
-    file_handler = RotatingFileHandler(
+    # File handler with rotation, buffered so chatty INFO logging from the
+    # interactive session loop doesn't hit the disk on every call; errors
+    # still flush immediately
+    from logging.handlers import RotatingFileHandler, MemoryHandler
+    rotating_handler = RotatingFileHandler(
         log_file, 
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
+    rotating_handler.setLevel(logging.DEBUG)
+    rotating_handler.setFormatter(detailed_formatter)
+    
+    file_handler = MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=rotating_handler)
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
     
     # Console handler
     console_handler = logging.StreamHandler()
@@ -64,6 +81,62 @@ def setup_logging(log_level: str = 'INFO', log_file: str = 'therapy_system.log')
     return logger
 
 
+# system_logs rows are written by a background thread so commands don't pay
+# for a second database round trip after their own write
+_LOG_QUEUE: "queue.Queue[tuple]" = queue.Queue()
+_LOG_BATCH_SIZE = 64
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def _write_log_rows(rows: List[tuple]) -> None:
+    """Insert a batch of system_logs rows in one transaction"""
+    try:
+        from database import TherapyDatabase
+        db = TherapyDatabase()
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO system_logs (log_level, module, action, patient_id, session_id, message, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+    except Exception:
+        pass  # Don't fail if database logging fails
+
+
+def _log_writer_loop() -> None:
+    """Drain the log queue, batching whatever has accumulated per write"""
+    while True:
+        rows = [_LOG_QUEUE.get()]
+        try:
+            while len(rows) < _LOG_BATCH_SIZE:
+                rows.append(_LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+        _write_log_rows(rows)
+        for _ in rows:
+            _LOG_QUEUE.task_done()
+
+
+def _ensure_log_writer() -> None:
+    """Start the background log writer on first use"""
+    global _log_writer
+    if _log_writer is not None:
+        return
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_log_writer_loop, name='therapy-log-writer', daemon=True)
+            _log_writer.start()
+            atexit.register(flush_logs)
+
+
+def flush_logs() -> None:
+    """Write out any buffered log records"""
+    if _log_writer is not None:
+        _LOG_QUEUE.join()
+    for handler in logging.getLogger('therapy_system').handlers:
+        handler.flush()
+
+
 def log_action(action: str, module: str, level: str = 'INFO', 
                patient_id: Optional[int] = None, session_id: Optional[int] = None,
                additional_data: Optional[Dict[str, Any]] = None) -> None:
@@ -94,16 +167,9 @@ def log_action(action: str, module: str, level: str = 'INFO',
     log_level = getattr(logging, level.upper(), logging.INFO)
     logger.log(log_level, message, extra={'log_data': log_data})
     
-    # Store in database if available
-    try:
-        from database import TherapyDatabase
-        db = TherapyDatabase()
-        db.execute_update('''
-            INSERT INTO system_logs (log_level, module, action, patient_id, session_id, message, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (level, module, action, patient_id, session_id, message, datetime.now().isoformat()))
-    except Exception:
-        pass  # Don't fail if database logging fails
+    # Queue for the background writer to store in the database
+    _ensure_log_writer()
+    _LOG_QUEUE.put((level, module, action, patient_id, session_id, message, log_data['timestamp']))
 
 
 def monitor_system_health() -> Dict[str, Any]:
@@ -171,8 +237,20 @@ def monitor_system_health() -> Dict[str, Any]:
 # Date and Time Helpers
 # =============================================================================
 
+_DATETIME_FORMATS = {
+    'default': '%Y-%m-%d %H:%M:%S',
+    'date_only': '%Y-%m-%d',
+    'time_only': '%H:%M:%S',
+    'friendly': '%B %d, %Y at %I:%M %p',
+    'short': '%m/%d/%y %H:%M',
+    'iso': '%Y-%m-%dT%H:%M:%S',
+    'clinical': '%d-%b-%Y %H:%M'
+}
+
+
+@functools.lru_cache(maxsize=2048)
 def format_datetime(dt: Union[datetime, str], format_type: str = 'default') -> str:
-    """Format datetime with various options"""
+    """Format datetime with various options (memoized, inputs are immutable)"""
     
     if isinstance(dt, str):
         try:
@@ -180,17 +258,7 @@ def format_datetime(dt: Union[datetime, str], format_type: str = 'default') -> s
         except ValueError:
             return dt  # Return as-is if can't parse
     
-    formats = {
-        'default': '%Y-%m-%d %H:%M:%S',
-        'date_only': '%Y-%m-%d',
-        'time_only': '%H:%M:%S',
-        'friendly': '%B %d, %Y at %I:%M %p',
-        'short': '%m/%d/%y %H:%M',
-        'iso': '%Y-%m-%dT%H:%M:%S',
-        'clinical': '%d-%b-%Y %H:%M'
-    }
-    
-    return dt.strftime(formats.get(format_type, formats['default']))
+    return dt.strftime(_DATETIME_FORMATS.get(format_type, _DATETIME_FORMATS['default']))
 
 
 def parse_date_input(date_input: str) -> Optional[date]:
@@ -394,6 +462,9 @@ class EncryptionHelper:
     """Simple encryption/decryption for sensitive data"""
     
     def __init__(self, key: Optional[str] = None):
+        # Imported here so every `from utils import ...` doesn't pay for it
+        from cryptography.fernet import Fernet
+        
         if key:
             # Use provided key
             key_bytes = key.encode()[:32].ljust(32, b'0')  # Ensure 32 bytes
@@ -582,21 +653,41 @@ def export_patient_data(patient_id: int, export_format: str = 'json') -> str:
         from database import TherapyDatabase
         db = TherapyDatabase()
         
-        # Get comprehensive patient data
-        patient_data = db.export_patient_data(patient_id)
-        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
+        if export_format.lower() in ('json', 'csv'):
+            # Whole-document formats need the complete patient record
+            patient_data = db.export_patient_data(patient_id)
+        
         if export_format.lower() == 'json':
             filename = f'patient_{patient_id}_export_{timestamp}.json'
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(patient_data, f, indent=2, default=str)
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(patient_data, default=str, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(patient_data, f, indent=2, default=str)
+        
+        elif export_format.lower() == 'ndjson':
+            # One JSON object per line; only a single row is held in memory
+            filename = f'patient_{patient_id}_export_{timestamp}.ndjson'
+            header = {'type': 'export', 'patient_id': patient_id,
+                      'export_timestamp': datetime.now().isoformat()}
+            records = ({'type': key, 'data': row} for key, row in db.iter_patient_records(patient_id))
+            
+            with open(filename, 'wb', buffering=256 * 1024) as f:
+                for record in itertools.chain((header,), records):
+                    if orjson is not None:
+                        f.write(orjson.dumps(record, default=str))
+                    else:
+                        f.write(json.dumps(record, default=str, separators=(',', ':')).encode('utf-8'))
+                    f.write(b'\n')
         
         elif export_format.lower() == 'csv':
             import csv
             filename = f'patient_{patient_id}_export_{timestamp}.csv'
             
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=256 * 1024) as f:
                 writer = csv.writer(f)
                 
                 # Write patient basic info
@@ -691,6 +782,71 @@ def generate_system_report() -> Dict[str, Any]:
         raise
 
 
+REPORT_CACHE_TTL = 60  # seconds
+
+
+def _report_cache_file(db_path: str) -> str:
+    """Report cache sidecar in the temp directory, one per database file"""
+    key = hashlib.sha256(os.path.abspath(db_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f'therapy_system_report_{key}.json')
+
+
+def _last_db_write(db_path: str) -> float:
+    """Latest mtime of the database or its WAL file, 0 if neither exists"""
+    latest = 0.0
+    for path in (db_path, f'{db_path}-wal'):
+        try:
+            latest = max(latest, os.path.getmtime(path))
+        except OSError:
+            pass
+    return latest
+
+
+def save_report(report: Dict[str, Any], filename: str):
+    """Write a report dict to a JSON file"""
+    
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(report, default=str,
+                                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+def get_system_report(max_age: int = REPORT_CACHE_TTL) -> Tuple[Dict[str, Any], float]:
+    """Return the system report and its age in seconds.
+    
+    The cached report is reused only while it is younger than max_age and no
+    write has reached the database since it was built; max_age=0 always rebuilds.
+    """
+    from config import Config
+    
+    db_path = Config.DATABASE_PATH
+    cache_file = _report_cache_file(db_path)
+    
+    try:
+        cached_at = os.path.getmtime(cache_file)
+        age = time.time() - cached_at
+        if age < max_age and cached_at >= _last_db_write(db_path):
+            with open(cache_file, 'rb') as f:
+                data = f.read()
+            return (orjson.loads(data) if orjson is not None else json.loads(data)), age
+    except (OSError, ValueError):
+        pass  # Missing, unreadable or corrupt cache - rebuild
+    
+    report = generate_system_report()
+    
+    try:
+        tmp_file = f'{cache_file}.tmp'
+        save_report(report, tmp_file)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log_action(f"Could not write report cache: {e}", "reporting", "WARNING")
+    
+    return report, 0.0
+
+
 # =============================================================================
 # Utility Testing and Validation
 # =============================================================================
@@ -708,7 +864,7 @@ def validate_system_requirements() -> Dict[str, bool]:
     
     # Check Python version
     import sys
-    if sys.version_info >= (3, 8):
+    if sys.version_info >= (3, 9):
         requirements['python_version'] = True
     
     # Check required modules